@@ -2,20 +2,63 @@
 """Longhorn instance-manager rollover helper.
 
 Discovers workloads attached to Longhorn volumes (optionally on a specific node),
-restarts them one-by-one, and prints live Longhorn migration metrics.
+restarts them one-by-one (or --parallel N at a time, within per-node detach
+limits), and prints live Longhorn migration metrics.
+
+Reads and writes go straight to the Kubernetes API over a pooled HTTPS session
+(in-cluster service account, or the current kubeconfig context) and fall back
+to `kubectl` subprocesses when that is unavailable; see --backend. Longhorn
+volumes, engines and instance managers are listed once and then kept current
+from watch events, so dashboards read them from memory. Rollout completion is
+also taken from watch events on the workload's status, so each workload moves
+on as soon as it is ready.
 """
 
 from __future__ import annotations
 
 import argparse
+import base64
+import http.client
 import json
+import os
 import re
+import select
 import shutil
+import ssl
 import subprocess
 import sys
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Sequence, Set, Tuple
+import urllib.parse
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+LONGHORN_NAMESPACE = "longhorn-system"
+SERVICE_ACCOUNT_DIR = "/var/run/secrets/kubernetes.io/serviceaccount"
+LONGHORN_RESOURCES = ("volumes", "engines", "instancemanagers")
+# metrics-server refreshes usage about every 15s, so polling it faster only adds load.
+METRICS_TTL = 15.0
+# Above this many namespaces, ReplicaSets are listed once cluster-wide instead of per namespace.
+REPLICASET_NAMESPACE_LIMIT = 10
+
+# Logical resource -> (kubectl resource name, API group/version path).
+RESOURCES: Dict[str, Tuple[str, str]] = {
+    "volumes": ("volumes.longhorn.io", "/apis/longhorn.io/v1beta2"),
+    "engines": ("engines.longhorn.io", "/apis/longhorn.io/v1beta2"),
+    "instancemanagers": ("instancemanagers.longhorn.io", "/apis/longhorn.io/v1beta2"),
+    "replicasets": ("replicasets", "/apis/apps/v1"),
+    "deployments": ("deployments", "/apis/apps/v1"),
+    "statefulsets": ("statefulsets", "/apis/apps/v1"),
+    "daemonsets": ("daemonsets", "/apis/apps/v1"),
+    "nodes": ("nodes", "/api/v1"),
+}
+
+# Workload.kind -> resource it names.
+KIND_RESOURCES = {"deploy": "deployments", "statefulset": "statefulsets", "daemonset": "daemonsets"}
 
 
 @dataclass(frozen=True)
@@ -46,6 +89,8 @@ class WorkloadPlan:
     volumes: List[str]
     migrated: bool
     reason: str
+    # Node of each attached volume; cycling the workload detaches it there.
+    volume_nodes: Dict[str, str] = field(default_factory=dict)
 
 
 def run(cmd: Sequence[str], expect_json: bool = False, allow_fail: bool = False):
@@ -67,46 +112,668 @@ def check_dependencies() -> None:
             raise RuntimeError(f"Missing required dependency: {tool}")
 
 
-def get_volumes() -> Dict:
-    return run(
-        ["kubectl", "-n", "longhorn-system", "get", "volumes.longhorn.io", "-o", "json"],
-        expect_json=True,
-    )
+QUANTITY_SUFFIXES = {
+    "n": 1e-9, "u": 1e-6, "m": 1e-3, "k": 1e3, "M": 1e6, "G": 1e9, "T": 1e12, "P": 1e15, "E": 1e18,
+    "Ki": 2 ** 10, "Mi": 2 ** 20, "Gi": 2 ** 30, "Ti": 2 ** 40, "Pi": 2 ** 50, "Ei": 2 ** 60,
+}
 
 
-def get_engines() -> Dict:
-    return run(
-        ["kubectl", "-n", "longhorn-system", "get", "engines.longhorn.io", "-o", "json"],
-        expect_json=True,
-    )
+def parse_quantity(value: str) -> float:
+    """Kubernetes resource quantity ("250m", "1536Ki", "2") as a plain number."""
+    match = re.fullmatch(r"([0-9.]+)([a-zA-Z]*)", value.strip())
+    if not match or (match.group(2) and match.group(2) not in QUANTITY_SUFFIXES):
+        return 0.0
+    return float(match.group(1)) * QUANTITY_SUFFIXES.get(match.group(2), 1)
 
 
-def get_replicaset_owner(ns: str, rs_name: str, cache: Dict[Tuple[str, str], Optional[Workload]]) -> Optional[Workload]:
-    key = (ns, rs_name)
-    if key in cache:
-        return cache[key]
+class WatchExpired(Exception):
+    """The watch's resourceVersion is too old (HTTP 410 Gone); the caller must list again."""
 
-    rs = run(["kubectl", "-n", ns, "get", "rs", rs_name, "-o", "json"], expect_json=True, allow_fail=True)
-    if not rs:
-        cache[key] = None
-        return None
 
-    for owner in rs.get("metadata", {}).get("ownerReferences", []):
+class Backend:
+    """Cluster access used by the rollover; counts calls and time spent in them."""
+
+    name = "backend"
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.seconds = 0.0
+        self.informers: Dict[str, Informer] = {}
+        self._metrics: Dict[str, Tuple[float, object]] = {}
+        self._stats_lock = threading.Lock()
+
+    def _record(self, started: float) -> None:
+        with self._stats_lock:
+            self.calls += 1
+            self.seconds += time.perf_counter() - started
+
+    def describe(self) -> str:
+        return f"{self.calls} {self.name} call(s), {self.seconds:.2f}s"
+
+    def metrics(self, key: str, fetch: Callable[[], object]) -> object:
+        """fetch() result, reused for METRICS_TTL seconds."""
+        with self._stats_lock:
+            entry = self._metrics.get(key)
+        if entry and time.monotonic() - entry[0] < METRICS_TTL:
+            return entry[1]
+        value = fetch()
+        with self._stats_lock:
+            self._metrics[key] = (time.monotonic(), value)
+        return value
+
+    def watch(self, resource: str, namespace: Optional[str], resource_version: str,
+              timeout_seconds: int = 300, field_selector: Optional[str] = None) -> Iterator[Dict]:
+        """Yield watch events newer than resource_version until the server ends the watch."""
+        raise NotImplementedError
+
+    def rollout_status(self, w: Workload, timeout: int) -> Iterator[str]:
+        """Yield `kubectl rollout status` style messages as w's rollout progresses.
+
+        Ends after the completion message; raises RuntimeError if the rollout
+        has not completed within timeout seconds.
+        """
+        raise NotImplementedError
+
+    def list(self, resource: str, namespace: Optional[str] = None, selector: Optional[str] = None) -> Dict:
+        raise NotImplementedError
+
+    def get(self, resource: str, namespace: str, name: str, allow_missing: bool = False) -> Dict:
+        raise NotImplementedError
+
+    def scale(self, w: Workload, replicas: int) -> None:
+        raise NotImplementedError
+
+    def restart(self, w: Workload) -> None:
+        raise NotImplementedError
+
+    def top_pods(self, namespace: str, selector: str) -> Dict[str, Tuple[str, str]]:
+        """Pod name -> (cpu, memory) as `kubectl top pod` prints them; empty if metrics are unavailable."""
+        raise NotImplementedError
+
+    def top_nodes(self) -> List[List[str]]:
+        """`kubectl top nodes` rows: name, cpu, cpu%, memory, memory%; empty if metrics are unavailable."""
+        raise NotImplementedError
+
+
+class KubectlBackend(Backend):
+    """One `kubectl` subprocess per call, via run()."""
+
+    name = "kubectl"
+
+    def __init__(self) -> None:
+        super().__init__()
+        check_dependencies()
+
+    def _run(self, cmd: Sequence[str], **kwargs):
+        started = time.perf_counter()
+        try:
+            return run(cmd, **kwargs)
+        finally:
+            self._record(started)
+
+    def list(self, resource: str, namespace: Optional[str] = None, selector: Optional[str] = None) -> Dict:
+        scope = ["-n", namespace] if namespace else ["--all-namespaces"]
+        cmd = ["kubectl"] + scope + ["get", RESOURCES[resource][0], "-o", "json"]
+        if selector:
+            cmd += ["-l", selector]
+        return self._run(cmd, expect_json=True)
+
+    def get(self, resource: str, namespace: str, name: str, allow_missing: bool = False) -> Dict:
+        cmd = ["kubectl", "-n", namespace, "get", RESOURCES[resource][0], name, "-o", "json"]
+        return self._run(cmd, expect_json=True, allow_fail=allow_missing)
+
+    def scale(self, w: Workload, replicas: int) -> None:
+        self._run(["kubectl", "-n", w.namespace, "scale", w.ref, f"--replicas={replicas}"])
+
+    def restart(self, w: Workload) -> None:
+        self._run(["kubectl", "-n", w.namespace, "rollout", "restart", w.ref])
+
+    def rollout_status(self, w: Workload, timeout: int) -> Iterator[str]:
+        # One `rollout status` for the whole wait; kubectl prints a line on each change.
+        cmd = ["kubectl", "-n", w.namespace, "rollout", "status", w.ref, f"--timeout={timeout}s"]
+        started = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            for line in proc.stdout:
+                if line.strip():
+                    yield line.strip()
+            stderr = proc.stderr.read().strip()
+            proc.wait()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            proc.stderr.close()
+            self._record(started)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Timed out waiting for {w.ref}: {stderr or 'timeout waiting for rollout'}")
+
+    def top_pods(self, namespace: str, selector: str) -> Dict[str, Tuple[str, str]]:
+        out = self._run(["kubectl", "-n", namespace, "top", "pod", "-l", selector, "--no-headers"], allow_fail=True)
+        return {cols[0]: (cols[1], cols[2]) for cols in (line.split() for line in (out or "").splitlines())
+                if len(cols) >= 3}
+
+    def top_nodes(self) -> List[List[str]]:
+        out = self._run(["kubectl", "top", "nodes", "--no-headers"], allow_fail=True)
+        return [line.split() for line in (out or "").splitlines()]
+
+
+class KubeAPIBackend(Backend):
+    """Direct Kubernetes API calls over a keep-alive HTTPS connection pool."""
+
+    name = "api"
+
+    def __init__(self, server: str, context: Optional[ssl.SSLContext], auth: Callable[[], Dict[str, str]],
+                 max_idle: int = 8, timeout: float = 60) -> None:
+        super().__init__()
+        url = urllib.parse.urlsplit(server)
+        self.scheme = url.scheme
+        self.host = url.hostname or ""
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.prefix = url.path.rstrip("/")
+        self.context = context
+        self.auth = auth
+        self.max_idle = max_idle
+        self.timeout = timeout
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "KubeAPIBackend":
+        """In-cluster service account if present, else the current kubeconfig context."""
+        host, port = os.environ.get("KUBERNETES_SERVICE_HOST"), os.environ.get("KUBERNETES_SERVICE_PORT", "443")
+        token_path = os.path.join(SERVICE_ACCOUNT_DIR, "token")
+        if host and os.path.exists(token_path):
+            context = ssl.create_default_context(cafile=os.path.join(SERVICE_ACCOUNT_DIR, "ca.crt"))
+            server = f"https://[{host}]:{port}" if ":" in host else f"https://{host}:{port}"
+
+            def service_account_auth() -> Dict[str, str]:
+                # Re-read every call: the kubelet rotates projected tokens.
+                with open(token_path, encoding="utf-8") as f:
+                    return {"Authorization": f"Bearer {f.read().strip()}"}
+
+            return cls(server, context, service_account_auth)
+
+        check_dependencies()
+        config = run(["kubectl", "config", "view", "--raw", "--minify", "-o", "json"], expect_json=True)
+        if not config.get("clusters") or not config.get("users"):
+            raise RuntimeError("kubeconfig has no current context")
+        return cls(config["clusters"][0]["cluster"]["server"], *kubeconfig_credentials(config))
+
+    def _connection(self, fresh: bool = False) -> http.client.HTTPConnection:
+        while not fresh:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            # An idle socket with something to read has been closed by the server.
+            if conn.sock is not None and not select.select([conn.sock], [], [], 0)[0]:
+                return conn
+            conn.close()
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(self.host, self.port, context=self.context, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None,
+                content_type: str = "application/json", allow_missing: bool = False) -> Dict:
+        headers = {"Accept": "application/json", **self.auth()}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = content_type
+        started = time.perf_counter()
+        try:
+            conn = self._connection()
+            reused = conn.sock is not None
+            while True:
+                sent = False
+                try:
+                    conn.request(method, self.prefix + path, body=data, headers=headers)
+                    sent = True
+                    response = conn.getresponse()
+                    payload = response.read()
+                    break
+                except (ConnectionResetError, BrokenPipeError, http.client.RemoteDisconnected):
+                    conn.close()
+                    # The API server closed a keep-alive socket; retry once on a new one, unless a
+                    # write may already have been applied (a second restart PATCH is a second rollout).
+                    if not reused or (sent and method != "GET"):
+                        raise
+                    conn, reused = self._connection(fresh=True), False
+                except Exception:
+                    conn.close()
+                    raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+        finally:
+            self._record(started)
+
+        if response.status == 404 and allow_missing:
+            return {}
+        if response.status >= 400:
+            try:
+                message = json.loads(payload).get("message", "")
+            except ValueError:
+                message = payload.decode("utf-8", "replace").strip()
+            raise RuntimeError(f"{method} {path} failed ({response.status}): {message}")
+        return json.loads(payload) if payload else {}
+
+    def watch(self, resource: str, namespace: Optional[str], resource_version: str,
+              timeout_seconds: int = 300, field_selector: Optional[str] = None) -> Iterator[Dict]:
+        params = {
+            "watch": "1",
+            "resourceVersion": resource_version,
+            "allowWatchBookmarks": "true",
+            "timeoutSeconds": timeout_seconds,
+        }
+        if field_selector:
+            params["fieldSelector"] = field_selector
+        query = urllib.parse.urlencode(params)
+        # A dedicated connection: the stream holds it for up to timeout_seconds.
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, context=self.context,
+                                               timeout=timeout_seconds + 30)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout_seconds + 30)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", f"{self.prefix}{self.path(resource, namespace)}?{query}",
+                         headers={"Accept": "application/json", **self.auth()})
+            response = conn.getresponse()
+            self._record(started)
+            if response.status == 410:
+                raise WatchExpired(f"{resource} watch from resourceVersion {resource_version} expired")
+            if response.status >= 400:
+                raise RuntimeError(f"watch {resource} failed ({response.status}): {response.read()[:200]!r}")
+            for line in iter(response.readline, b""):
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def follow(self, resource: str, namespace: str, name: str, deadline: float) -> Iterator[Dict]:
+        """Yield the object now and again after every change until deadline (time.monotonic())."""
+        while time.monotonic() < deadline:
+            obj = self.get(resource, namespace, name)
+            yield obj
+            version = obj.get("metadata", {}).get("resourceVersion", "")
+            try:
+                for event in self.watch(resource, namespace, version,
+                                        timeout_seconds=max(1, int(deadline - time.monotonic())),
+                                        field_selector=f"metadata.name={name}"):
+                    kind = event.get("type")
+                    if kind in ("ADDED", "MODIFIED"):
+                        yield event.get("object") or {}
+                    elif kind == "DELETED":
+                        raise RuntimeError(f"{resource} {namespace}/{name} was deleted")
+                    elif kind == "ERROR":
+                        status = event.get("object") or {}
+                        if status.get("code") != 410:
+                            raise RuntimeError(status.get("message", f"watch {resource} failed"))
+                        break
+            except WatchExpired:
+                pass
+            # The watch ended (server timeout or expired resourceVersion): read again and rewatch.
+
+    def rollout_status(self, w: Workload, timeout: int) -> Iterator[str]:
+        message = ""
+        for obj in self.follow(KIND_RESOURCES[w.kind], w.namespace, w.name, time.monotonic() + timeout):
+            done, latest = rollout_progress(w, obj)
+            if latest != message:
+                message = latest
+                yield message
+            if done:
+                return
+        raise RuntimeError(f"Timed out waiting for {w.ref}: {message or 'timeout waiting for rollout'}")
+
+    @staticmethod
+    def path(resource: str, namespace: Optional[str] = None, name: Optional[str] = None) -> str:
+        base = RESOURCES[resource][1]
+        parts = [base] + (["namespaces", namespace] if namespace else []) + [resource] + ([name] if name else [])
+        return "/".join(parts)
+
+    def list(self, resource: str, namespace: Optional[str] = None, selector: Optional[str] = None) -> Dict:
+        query = f"?labelSelector={urllib.parse.quote(selector)}" if selector else ""
+        return self.request("GET", self.path(resource, namespace) + query)
+
+    def get(self, resource: str, namespace: str, name: str, allow_missing: bool = False) -> Dict:
+        return self.request("GET", self.path(resource, namespace, name), allow_missing=allow_missing)
+
+    def scale(self, w: Workload, replicas: int) -> None:
+        self.request("PATCH", self.path(KIND_RESOURCES[w.kind], w.namespace, w.name) + "/scale",
+                     {"spec": {"replicas": replicas}}, content_type="application/merge-patch+json")
+
+    def restart(self, w: Workload) -> None:
+        # The same template annotation `kubectl rollout restart` sets.
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        patch = {"spec": {"template": {"metadata": {"annotations": {"kubectl.kubernetes.io/restartedAt": now}}}}}
+        self.request("PATCH", self.path(KIND_RESOURCES[w.kind], w.namespace, w.name), patch,
+                     content_type="application/strategic-merge-patch+json")
+
+    def top_pods(self, namespace: str, selector: str) -> Dict[str, Tuple[str, str]]:
+        try:
+            data = self.request("GET", f"/apis/metrics.k8s.io/v1beta1/namespaces/{namespace}/pods"
+                                       f"?labelSelector={urllib.parse.quote(selector)}")
+        except (RuntimeError, OSError):
+            return {}
+        top: Dict[str, Tuple[str, str]] = {}
+        for item in data.get("items", []):
+            containers = item.get("containers", [])
+            cpu = sum(parse_quantity(c.get("usage", {}).get("cpu", "0")) for c in containers)
+            mem = sum(parse_quantity(c.get("usage", {}).get("memory", "0")) for c in containers)
+            top[item.get("metadata", {}).get("name", "")] = (f"{cpu * 1000:.0f}m", f"{mem / 2 ** 20:.0f}Mi")
+        return top
+
+    def top_nodes(self) -> List[List[str]]:
+        try:
+            usage = self.request("GET", "/apis/metrics.k8s.io/v1beta1/nodes")
+            nodes = self.list("nodes")
+        except (RuntimeError, OSError):
+            return []
+        allocatable = {n.get("metadata", {}).get("name", ""): n.get("status", {}).get("allocatable", {})
+                       for n in nodes.get("items", [])}
+        rows = []
+        for item in usage.get("items", []):
+            name = item.get("metadata", {}).get("name", "")
+            cpu = parse_quantity(item.get("usage", {}).get("cpu", "0"))
+            mem = parse_quantity(item.get("usage", {}).get("memory", "0"))
+            cpu_total = parse_quantity(allocatable.get(name, {}).get("cpu", "0"))
+            mem_total = parse_quantity(allocatable.get(name, {}).get("memory", "0"))
+            rows.append([
+                name,
+                f"{cpu * 1000:.0f}m",
+                f"{cpu / cpu_total * 100:.0f}%" if cpu_total else "<unknown>",
+                f"{mem / 2 ** 20:.0f}Mi",
+                f"{mem / mem_total * 100:.0f}%" if mem_total else "<unknown>",
+            ])
+        return rows
+
+
+def kubeconfig_credentials(config: Dict) -> Tuple[ssl.SSLContext, Callable[[], Dict[str, str]]]:
+    """TLS context and auth header factory for the current context of `kubectl config view --raw -o json`."""
+    cluster = config["clusters"][0]["cluster"]
+    user = config["users"][0].get("user", {})
+    if cluster.get("tls-server-name") or user.get("auth-provider") or user.get("username"):
+        raise RuntimeError("kubeconfig uses tls-server-name, auth-provider or basic auth")
+
+    context = ssl.create_default_context()
+    if cluster.get("insecure-skip-tls-verify"):
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    elif cluster.get("certificate-authority-data"):
+        context.load_verify_locations(cadata=base64.b64decode(cluster["certificate-authority-data"]).decode("ascii"))
+    elif cluster.get("certificate-authority"):
+        context.load_verify_locations(cafile=cluster["certificate-authority"])
+
+    if user.get("client-certificate-data") and user.get("client-key-data"):
+        # load_cert_chain only takes paths; the files live just long enough to be read.
+        with tempfile.TemporaryDirectory() as tmp:
+            cert, key = os.path.join(tmp, "client.crt"), os.path.join(tmp, "client.key")
+            for path, data_key in ((cert, "client-certificate-data"), (key, "client-key-data")):
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT, 0o600)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(base64.b64decode(user[data_key]))
+            context.load_cert_chain(cert, key)
+    elif user.get("client-certificate") and user.get("client-key"):
+        context.load_cert_chain(user["client-certificate"], user["client-key"])
+
+    if user.get("token"):
+        header = {"Authorization": f"Bearer {user['token']}"}
+        return context, lambda: header
+    if user.get("tokenFile"):
+        def token_file_auth() -> Dict[str, str]:
+            with open(user["tokenFile"], encoding="utf-8") as f:
+                return {"Authorization": f"Bearer {f.read().strip()}"}
+        return context, token_file_auth
+    if user.get("exec"):
+        return context, exec_credential_auth(user["exec"], cluster)
+    return context, lambda: {}
+
+
+def exec_credential_auth(spec: Dict, cluster: Optional[Dict] = None) -> Callable[[], Dict[str, str]]:
+    """Bearer token from a client-go exec credential plugin, re-run once it expires."""
+    cached: Dict[str, object] = {}
+    lock = threading.Lock()
+    # Plugins read their request from KUBERNETES_EXEC_INFO, as kubectl sets it.
+    exec_info: Dict[str, object] = {"interactive": False}
+    if spec.get("provideClusterInfo") and cluster:
+        exec_info["cluster"] = {
+            key: value for key, value in (
+                ("server", cluster.get("server")),
+                ("certificate-authority-data", cluster.get("certificate-authority-data")),
+                ("insecure-skip-tls-verify", cluster.get("insecure-skip-tls-verify")),
+            ) if value is not None
+        }
+    exec_env = {"KUBERNETES_EXEC_INFO": json.dumps({
+        "apiVersion": spec.get("apiVersion", "client.authentication.k8s.io/v1"),
+        "kind": "ExecCredential",
+        "spec": exec_info,
+    })}
+
+    def auth() -> Dict[str, str]:
+        with lock:
+            expires = cached.get("expires")
+            if "token" not in cached or (expires is not None and time.time() >= expires):
+                env = dict(os.environ, **exec_env, **{e["name"]: e["value"] for e in spec.get("env") or []})
+                proc = subprocess.run([spec["command"]] + list(spec.get("args") or []),
+                                      capture_output=True, text=True, env=env)
+                if proc.returncode != 0:
+                    raise RuntimeError(f"exec credential plugin {spec['command']} failed: {proc.stderr.strip()}")
+                status = json.loads(proc.stdout).get("status", {})
+                if not status.get("token"):
+                    raise RuntimeError(f"exec credential plugin {spec['command']} returned no token")
+                cached["token"] = status["token"]
+                stamp = status.get("expirationTimestamp")
+                # Refresh a minute early so a call never goes out with a just-expired token.
+                cached["expires"] = (datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ").replace(
+                    tzinfo=timezone.utc).timestamp() - 60) if stamp else None
+            return {"Authorization": f"Bearer {cached['token']}"}
+
+    return auth
+
+
+def make_backend(choice: str) -> Backend:
+    """Build the requested backend; "auto" prefers the API and falls back to kubectl.
+
+    The API backend is probed with one small Longhorn list, so credentials,
+    RBAC and connectivity problems show up here rather than mid-run.
+    """
+    if choice in ("auto", "api"):
+        try:
+            kube = KubeAPIBackend.from_environment()
+            kube.request("GET", kube.path("volumes", LONGHORN_NAMESPACE) + "?limit=1")
+            return kube
+        except Exception as exc:  # noqa: BLE001
+            if choice == "api":
+                raise RuntimeError(f"Kubernetes API backend unavailable: {exc}") from exc
+            print(f"Kubernetes API backend unavailable ({exc}); falling back to kubectl.", file=sys.stderr)
+    return KubectlBackend()
+
+
+def compare_backends(kube: Backend) -> None:
+    """Time the Longhorn list calls through kubectl and the API (dry-run only)."""
+    if not isinstance(kube, KubeAPIBackend) or shutil.which("kubectl") is None:
+        return
+    resources = ("volumes", "engines", "instancemanagers")
+    timings = []
+    for backend in (KubectlBackend(), kube):
+        started = time.perf_counter()
+        for resource in resources:
+            backend.list(resource, LONGHORN_NAMESPACE)
+        timings.append(time.perf_counter() - started)
+    speedup = f" ({timings[0] / timings[1]:.1f}x faster)" if timings[1] else ""
+    print(f"\nBackend timing for {len(resources)} Longhorn list calls: "
+          f"kubectl {timings[0]:.2f}s, api {timings[1]:.2f}s{speedup}")
+
+
+class Informer:
+    """Local copy of one resource: a single list, then kept current from watch events.
+
+    Backends without watch support (kubectl) relist instead, at most once per
+    `resync` seconds, when the copy is read.
+    """
+
+    def __init__(self, kube: Backend, resource: str, namespace: Optional[str] = None, resync: float = 15.0) -> None:
+        self.kube = kube
+        self.resource = resource
+        self.namespace = namespace
+        self.resync = resync
+        self.lists = 0
+        self.events = 0
+        self.watching = False
+        self.changed = threading.Condition()
+        self._objects: Dict[Tuple[Optional[str], str], Dict] = {}
+        self._resource_version = ""
+        self._listed_at = 0.0
+
+    @staticmethod
+    def _key(obj: Dict) -> Tuple[Optional[str], str]:
+        meta = obj.get("metadata", {})
+        return meta.get("namespace"), meta.get("name", "")
+
+    def _relist(self) -> None:
+        data = self.kube.list(self.resource, self.namespace)
+        with self.changed:
+            self._objects = {self._key(item): item for item in data.get("items", [])}
+            self._resource_version = data.get("metadata", {}).get("resourceVersion", "")
+            self._listed_at = time.monotonic()
+            self.lists += 1
+            self.changed.notify_all()
+
+    def start(self, watch: bool = True) -> "Informer":
+        """List now; with watch, follow changes from a daemon thread (if the backend can watch)."""
+        self._relist()
+        if watch and type(self.kube).watch is not Backend.watch:
+            self.watching = True
+            threading.Thread(target=self._run, name=f"informer-{self.resource}", daemon=True).start()
+        self.kube.informers[self.resource] = self
+        return self
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            try:
+                for event in self.kube.watch(self.resource, self.namespace, self._resource_version):
+                    failures = 0
+                    self._apply(event)
+            except WatchExpired:
+                self._relist_quietly()
+            except Exception as exc:  # noqa: BLE001
+                # Dropped stream or API hiccup: back off, then resync from a fresh list.
+                failures += 1
+                print(f"WARN: {self.resource} watch failed ({exc}); relisting", file=sys.stderr)
+                time.sleep(min(30.0, 2.0 ** failures))
+                self._relist_quietly()
+
+    def _relist_quietly(self) -> None:
+        try:
+            self._relist()
+        except Exception as exc:  # noqa: BLE001
+            print(f"WARN: {self.resource} relist failed ({exc})", file=sys.stderr)
+
+    def _apply(self, event: Dict) -> None:
+        obj = event.get("object") or {}
+        kind = event.get("type")
+        if kind == "ERROR":
+            if obj.get("code") == 410:
+                raise WatchExpired(obj.get("message", "resourceVersion expired"))
+            raise RuntimeError(obj.get("message", "watch error"))
+        with self.changed:
+            version = obj.get("metadata", {}).get("resourceVersion")
+            if version:
+                self._resource_version = version
+            if kind in ("ADDED", "MODIFIED"):
+                self._objects[self._key(obj)] = obj
+            elif kind == "DELETED":
+                self._objects.pop(self._key(obj), None)
+            if kind != "BOOKMARK":
+                self.events += 1
+                self.changed.notify_all()
+
+    def snapshot(self) -> Dict:
+        """The current objects in list-response form; treat them as read-only."""
+        if not self.watching and time.monotonic() - self._listed_at >= self.resync:
+            self._relist()
+        with self.changed:
+            return {"items": list(self._objects.values())}
+
+    def describe(self) -> str:
+        return f"{self.resource}: {self.lists} list(s), {self.events} watch event(s)"
+
+
+def start_longhorn_informers(kube: Backend, watch: bool, resync: float) -> None:
+    for resource in LONGHORN_RESOURCES:
+        Informer(kube, resource, LONGHORN_NAMESPACE, resync=resync).start(watch=watch)
+
+
+def list_longhorn(kube: Backend, resource: str) -> Dict:
+    informer = kube.informers.get(resource)
+    if informer is not None:
+        return informer.snapshot()
+    return kube.list(resource, LONGHORN_NAMESPACE)
+
+
+def get_volumes(kube: Backend) -> Dict:
+    return list_longhorn(kube, "volumes")
+
+
+def get_engines(kube: Backend) -> Dict:
+    return list_longhorn(kube, "engines")
+
+
+def get_instance_managers(kube: Backend) -> Dict:
+    return list_longhorn(kube, "instancemanagers")
+
+
+def replicaset_owner(rs: Dict) -> Workload:
+    meta = rs.get("metadata", {})
+    ns, rs_name = meta.get("namespace", ""), meta.get("name", "")
+    for owner in meta.get("ownerReferences", []):
         if owner.get("kind") == "Deployment" and owner.get("name"):
-            wl = Workload(namespace=ns, kind="deploy", name=owner["name"])
-            cache[key] = wl
-            return wl
+            return Workload(namespace=ns, kind="deploy", name=owner["name"])
 
     # Fallback: strip RS hash suffix for older objects.
     guessed = re.sub(r"-[a-f0-9]{9,10}$", "", rs_name)
-    wl = Workload(namespace=ns, kind="deploy", name=guessed)
-    cache[key] = wl
-    return wl
-
-
-def resolve_workload(ns: str, wtype: str, wname: str, rs_cache: Dict[Tuple[str, str], Optional[Workload]]) -> Optional[Workload]:
+    return Workload(namespace=ns, kind="deploy", name=guessed)
+
+
+def index_replicaset_owners(kube: Backend, wanted: Set[Tuple[str, str]]) -> Dict[Tuple[str, str], Workload]:
+    """Owners of the wanted (namespace, ReplicaSet) pairs from one list per namespace, or one cluster-wide."""
+    namespaces = sorted({ns for ns, _ in wanted})
+    if not namespaces:
+        return {}
+    if len(namespaces) > REPLICASET_NAMESPACE_LIMIT:
+        lists = [kube.list("replicasets")]
+    else:
+        with ThreadPoolExecutor(max_workers=min(8, len(namespaces))) as pool:
+            lists = list(pool.map(lambda ns: kube.list("replicasets", ns), namespaces))
+
+    owners: Dict[Tuple[str, str], Workload] = {}
+    for data in lists:
+        for rs in data.get("items", []):
+            meta = rs.get("metadata", {})
+            key = (meta.get("namespace", ""), meta.get("name", ""))
+            if key in wanted:
+                owners[key] = replicaset_owner(rs)
+    return owners
+
+
+def resolve_workload(
+    ns: str, wtype: str, wname: str, rs_owners: Dict[Tuple[str, str], Workload]
+) -> Optional[Workload]:
     if wtype == "ReplicaSet":
-        return get_replicaset_owner(ns, wname, rs_cache)
+        # ReplicaSets that no longer exist resolve to nothing.
+        return rs_owners.get((ns, wname))
     if wtype == "Deployment":
         return Workload(namespace=ns, kind="deploy", name=wname)
     if wtype == "StatefulSet":
@@ -116,11 +783,11 @@ def resolve_workload(ns: str, wtype: str, wname: str, rs_cache: Dict[Tuple[str,
     return None
 
 
-def discover_workload_volumes(target_node: Optional[str]) -> Dict[Workload, Set[str]]:
-    vols = get_volumes()
-    rs_cache: Dict[Tuple[str, str], Optional[Workload]] = {}
+def discover_workload_volumes(kube: Backend, target_node: Optional[str]) -> Dict[Workload, Set[str]]:
+    vols = get_volumes(kube)
     workload_vols: Dict[Workload, Set[str]] = {}
 
+    attached: List[Tuple[str, str, List[Dict]]] = []
     for item in vols.get("items", []):
         volume_name = item.get("metadata", {}).get("name", "")
         st = item.get("status", {})
@@ -130,10 +797,17 @@ def discover_workload_volumes(target_node: Optional[str]) -> Dict[Workload, Set[
             continue
 
         ks = st.get("kubernetesStatus", {})
-        ns = ks.get("namespace")
-        statuses = ks.get("workloadsStatus") or []
+        attached.append((volume_name, ks.get("namespace"), ks.get("workloadsStatus") or []))
+
+    # Resolve every ReplicaSet owner up front from a few list calls rather than one get per ReplicaSet.
+    rs_owners = index_replicaset_owners(kube, {
+        (ns, ws.get("workloadName", "")) for _, ns, statuses in attached for ws in statuses
+        if ws.get("workloadType") == "ReplicaSet"
+    })
+
+    for volume_name, ns, statuses in attached:
         for ws in statuses:
-            wl = resolve_workload(ns, ws.get("workloadType", ""), ws.get("workloadName", ""), rs_cache)
+            wl = resolve_workload(ns, ws.get("workloadType", ""), ws.get("workloadName", ""), rs_owners)
             if wl is None:
                 continue
             if wl not in workload_vols:
@@ -144,12 +818,15 @@ def discover_workload_volumes(target_node: Optional[str]) -> Dict[Workload, Set[
     return workload_vols
 
 
-def build_workload_plans(workload_vols: Dict[Workload, Set[str]], target_pattern: str) -> List[WorkloadPlan]:
-    engines = get_engines()
-    im_data = run(
-        ["kubectl", "-n", "longhorn-system", "get", "instancemanagers.longhorn.io", "-o", "json"],
-        expect_json=True,
-    )
+def build_workload_plans(
+    kube: Backend, workload_vols: Dict[Workload, Set[str]], target_pattern: str
+) -> List[WorkloadPlan]:
+    engines = get_engines(kube)
+    im_data = get_instance_managers(kube)
+    vol_node = {
+        item.get("metadata", {}).get("name", ""): item.get("status", {}).get("currentNodeID", "")
+        for item in get_volumes(kube).get("items", [])
+    }
 
     im_image: Dict[str, str] = {}
     for item in im_data.get("items", []):
@@ -178,7 +855,15 @@ def build_workload_plans(workload_vols: Dict[Workload, Set[str]], target_pattern
 
         migrated = len(pending) == 0 and len(volumes) > 0
         reason = f"all attached volumes on {target_pattern} instance-manager" if migrated else "; ".join(pending)
-        plans.append(WorkloadPlan(workload=wl, volumes=volumes, migrated=migrated, reason=reason))
+        plans.append(
+            WorkloadPlan(
+                workload=wl,
+                volumes=volumes,
+                migrated=migrated,
+                reason=reason,
+                volume_nodes={vol: vol_node.get(vol, "") for vol in volumes},
+            )
+        )
 
     return plans
 
@@ -196,30 +881,11 @@ def parse_top_memory_to_mib(value: str) -> float:
     return 0.0
 
 
-def get_instance_manager_stats() -> List[InstanceManagerStat]:
-    data = run(
-        ["kubectl", "-n", "longhorn-system", "get", "instancemanagers.longhorn.io", "-o", "json"],
-        expect_json=True,
+def get_instance_manager_stats(kube: Backend) -> List[InstanceManagerStat]:
+    data = get_instance_managers(kube)
+    top_map = kube.metrics(
+        "instance-manager-pods", lambda: kube.top_pods(LONGHORN_NAMESPACE, "longhorn.io/component=instance-manager")
     )
-    top_out = run(
-        [
-            "kubectl",
-            "-n",
-            "longhorn-system",
-            "top",
-            "pod",
-            "-l",
-            "longhorn.io/component=instance-manager",
-            "--no-headers",
-        ],
-        allow_fail=True,
-    )
-
-    top_map: Dict[str, Tuple[str, str]] = {}
-    for line in (top_out or "").splitlines():
-        cols = line.split()
-        if len(cols) >= 3:
-            top_map[cols[0]] = (cols[1], cols[2])
 
     stats: List[InstanceManagerStat] = []
     for item in data.get("items", []):
@@ -242,15 +908,13 @@ def get_instance_manager_stats() -> List[InstanceManagerStat]:
     return stats
 
 
-def get_node_memory(target_node: Optional[str]) -> str:
-    out = run(["kubectl", "top", "nodes", "--no-headers"], allow_fail=True)
-    if not out:
+def get_node_memory(kube: Backend, target_node: Optional[str]) -> str:
+    rows = kube.metrics("nodes", kube.top_nodes)
+    if not rows:
         return "n/a"
 
-    lines = out.splitlines()
     if target_node:
-        for line in lines:
-            cols = line.split()
+        for cols in rows:
             if len(cols) >= 5 and cols[0] == target_node:
                 return f"{cols[3]} ({cols[4]})"
         return "n/a"
@@ -258,9 +922,8 @@ def get_node_memory(target_node: Optional[str]) -> str:
     # summarize max node mem%
     max_pct = -1
     max_line = None
-    for line in lines:
-        cols = line.split()
-        if len(cols) < 5:
+    for cols in rows:
+        if len(cols) < 5 or not cols[4].rstrip("%").isdigit():
             continue
         pct = int(cols[4].rstrip("%"))
         if pct > max_pct:
@@ -271,8 +934,8 @@ def get_node_memory(target_node: Optional[str]) -> str:
     return "n/a"
 
 
-def print_dashboard(target_node: Optional[str], target_pattern: str, header: str = "") -> None:
-    stats = get_instance_manager_stats()
+def print_dashboard(kube: Backend, target_node: Optional[str], target_pattern: str, header: str = "") -> None:
+    stats = get_instance_manager_stats(kube)
 
     if target_node:
         stats = [s for s in stats if s.node == target_node]
@@ -301,7 +964,7 @@ def print_dashboard(target_node: Optional[str], target_pattern: str, header: str
         f"new engines/replicas={new_engines}/{new_replicas}, "
         f"old mem={old_mem_mib:.0f}Mi, new mem={new_mem_mib:.0f}Mi"
     )
-    print(f"Node memory: {get_node_memory(target_node)}")
+    print(f"Node memory: {get_node_memory(kube, target_node)}")
 
     print("Instance Managers:")
     print("  NODE         NAME                                         E/R      MEM      IMAGE")
@@ -311,97 +974,278 @@ def print_dashboard(target_node: Optional[str], target_pattern: str, header: str
         print(f"  {s.node:<12} {s.name:<44} {er:<8} {s.memory:<8} {image_tag}")
 
 
-def restart_workload(w: Workload, timeout: int, interval: int, target_node: Optional[str], target_pattern: str) -> None:
+def rollout_progress(w: Workload, obj: Dict) -> Tuple[bool, str]:
+    """(complete, message) for a workload object, judged as `kubectl rollout status` does."""
+    meta, spec, status = obj.get("metadata", {}), obj.get("spec", {}), obj.get("status", {})
+    generation, observed = meta.get("generation", 0), status.get("observedGeneration", 0)
+    kind = {"deploy": "deployment", "daemonset": "daemon set"}.get(w.kind, w.kind)
+    done = f'{kind} "{w.name}" successfully rolled out'
+    waiting = f'Waiting for {kind} "{w.name}" rollout to finish: '
+    if not observed or generation > observed:
+        return False, f"Waiting for {kind} spec update to be observed..."
+
+    if w.kind == "daemonset":
+        desired = status.get("desiredNumberScheduled", 0)
+        updated = status.get("updatedNumberScheduled", 0)
+        available = status.get("numberAvailable", 0)
+        if updated < desired:
+            return False, waiting + f"{updated} out of {desired} new pods have been updated..."
+        if available < desired:
+            return False, waiting + f"{available} of {desired} updated pods are available..."
+        return True, done
+
+    replicas = spec.get("replicas", 1)
+    updated = status.get("updatedReplicas", 0)
+    if w.kind == "deploy":
+        for condition in status.get("conditions", []):
+            if condition.get("type") == "Progressing" and condition.get("reason") == "ProgressDeadlineExceeded":
+                raise RuntimeError(f'deployment "{w.name}" exceeded its progress deadline')
+        if updated < replicas:
+            return False, waiting + f"{updated} out of {replicas} new replicas have been updated..."
+        if status.get("replicas", 0) > updated:
+            return False, waiting + f"{status['replicas'] - updated} old replicas are pending termination..."
+        if status.get("availableReplicas", 0) < updated:
+            return False, waiting + f"{status.get('availableReplicas', 0)} of {updated} updated replicas are available..."
+        return True, done
+
+    ready = status.get("readyReplicas", 0)
+    if ready < replicas:
+        return False, f"Waiting for {replicas - ready} pods to be ready..."
+    strategy = spec.get("updateStrategy", {})
+    if strategy.get("type", "RollingUpdate") != "RollingUpdate":
+        return True, done
+    partition = strategy.get("rollingUpdate", {}).get("partition", 0)
+    if partition and updated < replicas - partition:
+        return False, f"Waiting for partitioned roll out to finish: {updated} out of {replicas - partition} new pods have been updated..."
+    if not partition and status.get("updateRevision") != status.get("currentRevision"):
+        return False, f"waiting for statefulset rolling update to complete {updated} pods at revision {status.get('updateRevision')}..."
+    return True, done
+
+
+def wait_rollout(kube: Backend, w: Workload, timeout: int, progress: Optional[Callable[[str], None]] = None) -> str:
+    """Block until w's rollout completes, calling progress(message) on each status change; returns the last message."""
+    message = "rollout complete"
+    for message in kube.rollout_status(w, timeout):
+        if progress:
+            progress(message)
+    return message
+
+
+def wait_rollout_with_dashboard(
+    kube: Backend,
+    w: Workload,
+    timeout: int,
+    interval: int,
+    target_node: Optional[str],
+    target_pattern: str,
+    header: str,
+    dashboard: bool,
+) -> None:
+    """wait_rollout, printing the dashboard as the status changes (at most once per interval) and on completion."""
+    start = last = time.time()
+    shown = ""
+
+    def progress(message: str) -> None:
+        nonlocal last, shown
+        if time.time() - last >= interval:
+            last, shown = time.time(), message
+            print_dashboard(kube, target_node, target_pattern, header=f"{header} | t+{int(last - start)}s")
+
+    message = wait_rollout(kube, w, timeout, progress if dashboard else None)
+    if dashboard and shown != message:
+        print_dashboard(kube, target_node, target_pattern, header=f"{header} | t+{int(time.time() - start)}s")
+    print(f"Completed: {message}")
+
+
+def restart_workload(
+    kube: Backend,
+    w: Workload,
+    timeout: int,
+    interval: int,
+    target_node: Optional[str],
+    target_pattern: str,
+    dashboard: bool = True,
+) -> None:
     print(f"\n-- Restarting {w.namespace} {w.ref}")
-    run(["kubectl", "-n", w.namespace, "rollout", "restart", w.ref])
-
-    start = time.time()
-    while True:
-        elapsed = int(time.time() - start)
-        status = subprocess.run(
-            ["kubectl", "-n", w.namespace, "rollout", "status", w.ref, "--timeout=5s"],
-            capture_output=True,
-            text=True,
-        )
-        print_dashboard(target_node, target_pattern, header=f"{w.ref} | t+{elapsed}s")
-        if status.returncode == 0:
-            msg = status.stdout.strip().splitlines()[-1] if status.stdout.strip() else "rollout complete"
-            print(f"Completed: {msg}")
-            return
-
-        if time.time() - start > timeout:
-            stderr = status.stderr.strip()
-            stdout = status.stdout.strip()
-            detail = stderr or stdout or "timeout waiting for rollout"
-            raise RuntimeError(f"Timed out waiting for {w.ref}: {detail}")
-
-        time.sleep(interval)
-
-
-def get_replicas(w: Workload) -> int:
-    out = run(
-        [
-            "kubectl",
-            "-n",
-            w.namespace,
-            "get",
-            w.ref,
-            "-o",
-            "jsonpath={.spec.replicas}",
-        ]
-    ).strip()
-    if out == "":
-        return 1
-    return int(out)
+    kube.restart(w)
+    wait_rollout_with_dashboard(kube, w, timeout, interval, target_node, target_pattern, w.ref, dashboard)
 
 
-def scale_workload(w: Workload, replicas: int) -> None:
-    run(["kubectl", "-n", w.namespace, "scale", w.ref, f"--replicas={replicas}"])
+def get_replicas(kube: Backend, w: Workload) -> int:
+    replicas = kube.get(KIND_RESOURCES[w.kind], w.namespace, w.name).get("spec", {}).get("replicas")
+    return 1 if replicas is None else int(replicas)
 
 
-def wait_rollout(w: Workload, timeout: int) -> None:
-    run(["kubectl", "-n", w.namespace, "rollout", "status", w.ref, f"--timeout={timeout}s"])
+def scale_workload(kube: Backend, w: Workload, replicas: int) -> None:
+    kube.scale(w, replicas)
 
 
 def bounce_workload(
-    w: Workload, timeout: int, interval: int, target_node: Optional[str], target_pattern: str, down_wait: int
+    kube: Backend,
+    w: Workload,
+    timeout: int,
+    interval: int,
+    target_node: Optional[str],
+    target_pattern: str,
+    down_wait: int,
+    dashboard: bool = True,
 ) -> None:
     if w.kind not in ("deploy", "statefulset"):
         # DaemonSets cannot scale to 0, fallback to rollout restart.
-        restart_workload(w, timeout=timeout, interval=interval, target_node=target_node, target_pattern=target_pattern)
+        restart_workload(
+            kube,
+            w,
+            timeout=timeout,
+            interval=interval,
+            target_node=target_node,
+            target_pattern=target_pattern,
+            dashboard=dashboard,
+        )
         return
 
-    original = get_replicas(w)
+    original = get_replicas(kube, w)
     print(f"\n-- Bounce {w.namespace} {w.ref} (replicas {original} -> 0 -> {original})")
-    scale_workload(w, 0)
-    wait_rollout(w, timeout=timeout)
-    print_dashboard(target_node, target_pattern, header=f"{w.ref} scaled to 0")
+    scale_workload(kube, w, 0)
+    wait_rollout(kube, w, timeout)
+    if dashboard:
+        print_dashboard(kube, target_node, target_pattern, header=f"{w.ref} scaled to 0")
 
     if down_wait > 0:
-        print(f"Waiting {down_wait}s for detach to settle...")
+        print(f"Waiting {down_wait}s for {w.ref} detach to settle...")
         time.sleep(down_wait)
-        print_dashboard(target_node, target_pattern, header=f"{w.ref} detach wait complete")
-
-    scale_workload(w, original)
-    start = time.time()
-    while True:
-        elapsed = int(time.time() - start)
-        status = subprocess.run(
-            ["kubectl", "-n", w.namespace, "rollout", "status", w.ref, "--timeout=5s"],
-            capture_output=True,
-            text=True,
+        if dashboard:
+            print_dashboard(kube, target_node, target_pattern, header=f"{w.ref} detach wait complete")
+
+    scale_workload(kube, w, original)
+    wait_rollout_with_dashboard(
+        kube, w, timeout, interval, target_node, target_pattern, f"{w.ref} scale-up", dashboard
+    )
+
+
+def cycle_workload(kube: Backend, w: Workload, args: argparse.Namespace, dashboard: bool = True) -> None:
+    if args.strategy == "bounce":
+        bounce_workload(
+            kube,
+            w,
+            timeout=args.timeout,
+            interval=args.interval,
+            target_node=args.node,
+            target_pattern=args.target,
+            down_wait=args.down_wait,
+            dashboard=dashboard,
+        )
+    else:
+        restart_workload(
+            kube,
+            w,
+            timeout=args.timeout,
+            interval=args.interval,
+            target_node=args.node,
+            target_pattern=args.target,
+            dashboard=dashboard,
         )
-        print_dashboard(target_node, target_pattern, header=f"{w.ref} scale-up | t+{elapsed}s")
-        if status.returncode == 0:
-            msg = status.stdout.strip().splitlines()[-1] if status.stdout.strip() else "rollout complete"
-            print(f"Completed: {msg}")
-            return
-        if time.time() - start > timeout:
-            stderr = status.stderr.strip()
-            stdout = status.stdout.strip()
-            detail = stderr or stdout or "timeout waiting for rollout"
-            raise RuntimeError(f"Timed out waiting for {w.ref}: {detail}")
-        time.sleep(interval)
+
+
+class RolloverScheduler:
+    """Pick workloads that may cycle now without breaking the concurrency limits.
+
+    At most `parallel` workloads run at once, a node never has more than
+    `max_per_node` volumes detaching at once (a workload needing more than that
+    on one node runs alone there), and workloads sharing a volume never overlap.
+    Otherwise workloads start in plan order.
+    """
+
+    def __init__(self, plans: List[WorkloadPlan], parallel: int, max_per_node: int) -> None:
+        self.pending = list(plans)
+        self.parallel = max(1, parallel)
+        self.max_per_node = max(1, max_per_node)
+        self.running: Dict[Workload, Tuple[WorkloadPlan, float]] = {}
+        self.node_load: Counter = Counter()
+        self.busy_volumes: Set[str] = set()
+
+    def _blocker(self, plan: WorkloadPlan) -> Optional[str]:
+        if self.busy_volumes.intersection(plan.volumes):
+            return "shared volume"
+        for node, count in Counter(n for n in plan.volume_nodes.values() if n).items():
+            if self.node_load[node] and self.node_load[node] + count > self.max_per_node:
+                return "node limit"
+        return None
+
+    def next_ready(self) -> List[WorkloadPlan]:
+        """Mark as running and return every pending plan that may start now."""
+        started = []
+        for plan in list(self.pending):
+            if len(self.running) >= self.parallel:
+                break
+            if self._blocker(plan) is None:
+                self.pending.remove(plan)
+                self.running[plan.workload] = (plan, time.time())
+                self.node_load.update(n for n in plan.volume_nodes.values() if n)
+                self.busy_volumes.update(plan.volumes)
+                started.append(plan)
+        return started
+
+    def finish(self, w: Workload) -> None:
+        plan, _ = self.running.pop(w)
+        self.node_load.subtract(n for n in plan.volume_nodes.values() if n)
+        self.busy_volumes.difference_update(plan.volumes)
+
+    def blocked(self) -> Counter:
+        return Counter(self._blocker(plan) or "concurrency" for plan in self.pending)
+
+
+def run_parallel(
+    kube: Backend, plans: List[WorkloadPlan], args: argparse.Namespace
+) -> List[Tuple[Workload, str]]:
+    """Cycle plans concurrently under RolloverScheduler limits, printing aggregate progress."""
+    scheduler = RolloverScheduler(plans, args.parallel, args.max_per_node)
+    failures: List[Tuple[Workload, str]] = []
+    futures: Dict[Future, Workload] = {}
+    done = 0
+    stopping = False
+    last_progress = 0.0
+
+    with ThreadPoolExecutor(max_workers=scheduler.parallel) as pool:
+        while futures or (scheduler.pending and not stopping):
+            if not stopping:
+                for plan in scheduler.next_ready():
+                    w = plan.workload
+                    nodes = ",".join(sorted(set(plan.volume_nodes.values()) - {""})) or "?"
+                    print(f"\n## start {w.namespace} {w.ref} (nodes: {nodes})")
+                    futures[pool.submit(cycle_workload, kube, w, args, False)] = w
+
+            finished, _ = wait(list(futures), timeout=args.interval, return_when=FIRST_COMPLETED)
+            for future in finished:
+                w = futures.pop(future)
+                scheduler.finish(w)
+                done += 1
+                exc = future.exception()
+                if exc is None:
+                    print(f"## done  {w.namespace} {w.ref}")
+                    continue
+                failures.append((w, str(exc)))
+                print(f"ERROR: {w.namespace} {w.ref}: {exc}")
+                if not args.continue_on_error and not stopping:
+                    stopping = True
+                    print("Not starting further workloads; waiting for running ones to finish.")
+
+            if finished and time.time() - last_progress < args.interval:
+                continue
+            last_progress = time.time()
+            now = time.time()
+            running = ", ".join(f"{w.ref} t+{int(now - started)}s" for w, (_, started) in scheduler.running.items())
+            blocked = ", ".join(f"{n} {reason}" for reason, n in sorted(scheduler.blocked().items()))
+            print_dashboard(
+                kube,
+                args.node,
+                args.target,
+                header=f"Progress: {done}/{len(plans)} done, {len(failures)} failed, "
+                f"{len(scheduler.running)} running, {len(scheduler.pending)} queued",
+            )
+            print(f"Running: {running or '-'}")
+            if scheduler.pending:
+                print(f"Queued ({blocked})")
+    return failures
 
 
 def filter_plans(
@@ -453,6 +1297,19 @@ def parse_args() -> argparse.Namespace:
     )
     p.add_argument("--execute", action="store_true", help="Actually restart workloads (default is dry-run)")
     p.add_argument("--continue-on-error", action="store_true", help="Continue to next workload if one fails")
+    p.add_argument("--parallel", type=int, default=1, help="Workloads to cycle at the same time")
+    p.add_argument(
+        "--max-per-node",
+        type=int,
+        default=1,
+        help="With --parallel, max volumes detaching at once on any node (by volume currentNodeID)",
+    )
+    p.add_argument(
+        "--backend",
+        choices=("auto", "api", "kubectl"),
+        default="auto",
+        help="Cluster access: direct Kubernetes API calls, kubectl subprocesses, or API with kubectl fallback",
+    )
     return p.parse_args()
 
 
@@ -460,14 +1317,16 @@ def main() -> int:
     args = parse_args()
 
     try:
-        check_dependencies()
-        workload_vols = discover_workload_volumes(args.node)
-        plans = build_workload_plans(workload_vols, args.target)
+        kube = make_backend(args.backend)
+        # Dry-runs read each Longhorn resource once; executions follow changes by watch.
+        start_longhorn_informers(kube, watch=args.execute, resync=args.interval)
+        workload_vols = discover_workload_volumes(kube, args.node)
+        plans = build_workload_plans(kube, workload_vols, args.target)
         plans = filter_plans(plans, args.namespace, args.include, args.limit)
 
         if not plans:
             print("No matching Longhorn-attached workloads found.")
-            print_dashboard(args.node, args.target, header="Current Longhorn State")
+            print_dashboard(kube, args.node, args.target, header="Current Longhorn State")
             return 0
 
         selected = plans if args.no_skip_migrated else [p for p in plans if not p.migrated]
@@ -478,48 +1337,43 @@ def main() -> int:
             prefix = "SKIP" if p.migrated and not args.no_skip_migrated else "RUN "
             print(f"  {idx:>2}. [{prefix}] {p.workload.namespace} {p.workload.ref}")
 
-        print_dashboard(args.node, args.target, header="Pre-Run Metrics")
+        print_dashboard(kube, args.node, args.target, header="Pre-Run Metrics")
 
         if not args.execute:
             if skipped and not args.no_skip_migrated:
                 print(f"\nWill auto-skip {len(skipped)} workload(s) already migrated to {args.target}.")
+            print(f"\nCluster reads: {kube.describe()}")
+            compare_backends(kube)
             print("\nDry-run mode. Re-run with --execute to apply restarts.")
             return 0
 
         if not selected:
             print(f"\nAll matched workloads are already migrated to {args.target}; nothing to do.")
-            print_dashboard(args.node, args.target, header="Post-Run Metrics")
+            print_dashboard(kube, args.node, args.target, header="Post-Run Metrics")
             return 0
 
         failures = []
-        for idx, p in enumerate(selected, 1):
-            w = p.workload
-            print(f"\n## [{idx}/{len(selected)}] {w.namespace} {w.ref}")
-            try:
-                if args.strategy == "bounce":
-                    bounce_workload(
-                        w,
-                        timeout=args.timeout,
-                        interval=args.interval,
-                        target_node=args.node,
-                        target_pattern=args.target,
-                        down_wait=args.down_wait,
-                    )
-                else:
-                    restart_workload(
-                        w,
-                        timeout=args.timeout,
-                        interval=args.interval,
-                        target_node=args.node,
-                        target_pattern=args.target,
-                    )
-            except Exception as exc:  # noqa: BLE001
-                failures.append((w, str(exc)))
-                print(f"ERROR: {exc}")
-                if not args.continue_on_error:
-                    break
-
-        print_dashboard(args.node, args.target, header="Post-Run Metrics")
+        if args.parallel > 1:
+            print(
+                f"\nCycling up to {args.parallel} workload(s) at once, "
+                f"max {args.max_per_node} detaching volume(s) per node."
+            )
+            failures = run_parallel(kube, selected, args)
+        else:
+            for idx, p in enumerate(selected, 1):
+                w = p.workload
+                print(f"\n## [{idx}/{len(selected)}] {w.namespace} {w.ref}")
+                try:
+                    cycle_workload(kube, w, args)
+                except Exception as exc:  # noqa: BLE001
+                    failures.append((w, str(exc)))
+                    print(f"ERROR: {exc}")
+                    if not args.continue_on_error:
+                        break
+
+        print_dashboard(kube, args.node, args.target, header="Post-Run Metrics")
+        print(f"\nCluster calls: {kube.describe()}; "
+              + "; ".join(informer.describe() for informer in kube.informers.values()))
 
         if failures:
             print("\nFailures:")
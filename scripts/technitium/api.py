@@ -0,0 +1,688 @@
+"""
+Technitium API client shared by the manage.py subcommands.
+
+Keep-alive connection pools, retries with a per-host circuit breaker, a
+request-scoped cache for read-only calls, per-endpoint call timings, the
+structured results behind `--output json`, bounded concurrency helpers and the
+zone/record read helpers that several commands build on.
+"""
+
+import csv
+import http.client
+import json
+import os
+import random
+import select
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Default Configuration
+DEFAULT_PRIMARY = "192.168.1.7"
+DEFAULT_SECONDARY = "192.168.1.8"
+DEFAULT_PORT = 5380
+DEFAULT_ZONE = "torquasmvo.internal"
+ENV_TOKEN = os.environ.get("TECHNITIUM_TOKEN")
+
+
+class UsageError(Exception):
+    """Invalid command-line arguments found by a command; reported like an argparse error."""
+
+
+class ConnectError(ConnectionError):
+    """The TCP connection could not be opened, so the request was never sent."""
+
+
+class HTTPStatusError(http.client.HTTPException):
+    def __init__(self, status, reason):
+        super().__init__(f"HTTP Error {status}: {reason}")
+        self.status = status
+
+
+def is_connection_dropped(conn):
+    """True if an idle pooled connection was closed by the node.
+
+    An idle socket should have nothing to read; readable means EOF or a
+    stray byte, and either way it cannot carry the next request. Sending
+    into it would still succeed, so the failure would only show at
+    getresponse().
+    """
+    if conn.sock is None:
+        return True
+    try:
+        return bool(select.select([conn.sock], [], [], 0)[0])
+    except (OSError, ValueError):
+        return True
+
+
+class HostPool:
+    """Keep-alive HTTP connection pool for a single Technitium node."""
+
+    def __init__(self, host, port=DEFAULT_PORT, max_idle=16):
+        self.host = host
+        self.port = port
+        self.max_idle = max_idle
+        self.connections_opened = 0
+        self.requests_served = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self, timeout, connect_timeout):
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    self.connections_opened += 1
+            if conn is None:
+                return http.client.HTTPConnection(self.host, self.port, timeout=connect_timeout), False
+            if not is_connection_dropped(conn):
+                break
+            conn.close()
+        conn.timeout = timeout
+        if conn.sock:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def request(self, method, path, timeout=30, idempotent=True, connect_timeout=3):
+        """Send a request and return the raw response body.
+
+        Opening a connection may take connect_timeout seconds, so a down node
+        fails quickly; timeout then applies to the request itself. A pooled
+        socket the node has since closed is replaced and the request resent
+        only if it never went out or is idempotent; otherwise the node may
+        already have applied it, and the error is left to the caller.
+        """
+        while True:
+            conn, reused = self._acquire(timeout, connect_timeout)
+            if conn.sock is None:
+                try:
+                    conn.connect()
+                except OSError as e:
+                    conn.close()
+                    raise ConnectError(f"cannot connect to {self.host}:{self.port}: {e}") from e
+                conn.timeout = timeout
+                conn.sock.settimeout(timeout)
+            sent = False
+            try:
+                conn.request(method, path)
+                sent = True
+                response = conn.getresponse()
+                body = response.read()
+            except (ConnectionResetError, BrokenPipeError, http.client.BadStatusLine):
+                conn.close()
+                # The node closed an idle keep-alive socket; retry on a fresh one.
+                if reused and (idempotent or not sent):
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            with self._lock:
+                self.requests_served += 1
+
+            if response.status >= 400:
+                raise HTTPStatusError(response.status, response.reason)
+            return body
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def split_host_port(address):
+    """'10.0.0.1:5381' -> ('10.0.0.1', 5381); bare hosts use DEFAULT_PORT."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit() and ":" not in host:
+        return host, int(port)
+    return address, DEFAULT_PORT
+
+
+def get_pool(host):
+    """Return the shared connection pool for a host ("addr" or "addr:port"), creating it on first use."""
+    with _POOLS_LOCK:
+        pool = _POOLS.get(host)
+        if pool is None:
+            pool = _POOLS[host] = HostPool(*split_host_port(host))
+        return pool
+
+
+def print_connection_stats():
+    """Print connections opened vs. requests served for every host contacted."""
+    print("\n--- Connection Stats ---", file=sys.stderr)
+    print(f"{'Host':<20} {'Opened':>8} {'Requests':>10} {'Reuse':>8}", file=sys.stderr)
+    for host, pool in sorted(_POOLS.items()):
+        served = pool.requests_served
+        reuse = (1 - pool.connections_opened / served) if served else 0.0
+        print(f"{host:<20} {pool.connections_opened:>8} {served:>10} {reuse:>7.0%}", file=sys.stderr)
+
+
+# Writes that can safely be sent twice; other writes are only retried when the
+# connection failed before the request went out.
+IDEMPOTENT_WRITES = {"/settings/set", "/zones/options/set"}
+
+
+class CircuitBreaker:
+    """Fail fast on a host after `threshold` consecutive transport errors.
+
+    Once open, calls are refused for `cooldown` seconds; then a single trial
+    call is let through, which closes the breaker on success or reopens it.
+    """
+
+    def __init__(self, host, threshold=5, cooldown=30):
+        self.host = host
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        if not self.threshold:
+            return True
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_in_flight:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def trip(self):
+        """Open at once: the host refused or ignored a connection, so it is likely down.
+
+        Returns True if this call opened it (or breaking is disabled): that
+        call may keep retrying, every other call fails fast.
+        """
+        if not self.threshold:
+            return True
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            opened = self.opened_at is None
+            if opened:
+                print(f"Circuit open for {self.host}: cannot connect; failing fast for {self.cooldown:g}s",
+                      file=sys.stderr)
+            self.opened_at = time.monotonic()
+            return opened
+
+    def record(self, ok):
+        if not self.threshold:
+            return
+        with self._lock:
+            self.trial_in_flight = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                if self.opened_at is None:
+                    print(f"Circuit open for {self.host} after {self.failures} consecutive failures; "
+                          f"failing fast for {self.cooldown:g}s", file=sys.stderr)
+                self.opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """Retry/backoff and circuit breaker settings shared by every make_request call."""
+
+    def __init__(self, retries=2, backoff=0.5, max_backoff=8.0, threshold=5, cooldown=30, connect_timeout=3.0):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.connect_timeout = connect_timeout
+        self.breakers = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host):
+        with self._lock:
+            breaker = self.breakers.get(host)
+            if breaker is None:
+                breaker = self.breakers[host] = CircuitBreaker(host, self.threshold, self.cooldown)
+            return breaker
+
+    def count(self, host, field):
+        with self._lock:
+            host_stats = self.stats.setdefault(host, Counter())
+            host_stats[field] += 1
+
+    def delay(self, attempt):
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+
+def is_transient(error):
+    if isinstance(error, HTTPStatusError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+RETRY_POLICY = RetryPolicy()
+
+
+def print_retry_summary():
+    """Print retried, failed and short-circuited calls per host, if there were any."""
+    if not any(RETRY_POLICY.stats.values()):
+        return
+    print("\n--- API Call Failures ---", file=sys.stderr)
+    print(f"{'Host':<20} {'Retried':>8} {'Failed':>8} {'Fast-failed':>12}", file=sys.stderr)
+    for host, st in sorted(RETRY_POLICY.stats.items()):
+        print(f"{host:<20} {st['retried']:>8} {st['failed']:>8} {st['short_circuited']:>12}", file=sys.stderr)
+
+
+# Read-only endpoints whose responses may be reused within one run.
+CACHEABLE_ENDPOINTS = {"/settings/get", "/zones/list", "/zones/records/get", "/zones/options/get"}
+READ_ONLY_ACTIONS = ("get", "list", "query")
+
+
+def is_read_only(endpoint, method="GET"):
+    """True for API calls that cannot change server state (many writes are GETs too)."""
+    return method == "GET" and endpoint.rstrip("/").rsplit("/", 1)[-1] in READ_ONLY_ACTIONS
+
+
+class ResponseCache:
+    """Request-scoped memo of read-only API responses with per-host invalidation.
+
+    Raw response bodies are stored so every hit decodes a fresh object that
+    callers may mutate. Any non-read call to a host drops that host's entries,
+    both before it is sent and again once it returns.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self._entries = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.stats = {}
+
+    def _count(self, host, field):
+        host_stats = self.stats.setdefault(host, {"hits": 0, "misses": 0, "invalidations": 0})
+        host_stats[field] += 1
+
+    def get(self, host, key):
+        """Return (cached body or None, generation to pass back to put)."""
+        with self._lock:
+            entry = self._entries.get((host, key))
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._count(host, "hits")
+                return entry[1], None
+            self._count(host, "misses")
+            return None, self._generations.get(host, 0)
+
+    def put(self, host, key, body, generation):
+        with self._lock:
+            # Skip responses that were in flight while a write invalidated the host.
+            if self._generations.get(host, 0) == generation:
+                self._entries[(host, key)] = (time.monotonic(), body)
+
+    def invalidate(self, host, count=True):
+        with self._lock:
+            stale = [k for k in self._entries if k[0] == host]
+            for k in stale:
+                del self._entries[k]
+            self._generations[host] = self._generations.get(host, 0) + 1
+            if count:
+                self._count(host, "invalidations")
+
+
+RESPONSE_CACHE = ResponseCache()
+
+
+def print_cache_stats():
+    """Print response cache hits/misses for every host contacted."""
+    print("\n--- Response Cache Stats ---", file=sys.stderr)
+    print(f"{'Host':<20} {'Hits':>8} {'Misses':>8} {'Invalidated':>12} {'Hit rate':>9}", file=sys.stderr)
+    for host, st in sorted(RESPONSE_CACHE.stats.items()):
+        lookups = st["hits"] + st["misses"]
+        rate = st["hits"] / lookups if lookups else 0.0
+        print(f"{host:<20} {st['hits']:>8} {st['misses']:>8} {st['invalidations']:>12} {rate:>8.0%}", file=sys.stderr)
+
+
+class CallTimings:
+    """Per-endpoint API call counts, errors, bytes and latencies for `--timings`.
+
+    Every attempt sent to a node is counted, including retries; bytes are the
+    request URL and the response body (HTTP headers are not included).
+    """
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, endpoint):
+        return self.endpoints.setdefault(endpoint, {
+            "calls": 0, "errors": 0, "cached": 0, "bytes_sent": 0, "bytes_received": 0, "latencies": [],
+        })
+
+    def record(self, endpoint, seconds, sent, received=0, ok=True):
+        with self._lock:
+            st = self._stats(endpoint)
+            st["calls"] += 1
+            st["errors"] += not ok
+            st["bytes_sent"] += sent
+            st["bytes_received"] += received
+            st["latencies"].append(seconds)
+
+    def record_cached(self, endpoint):
+        with self._lock:
+            self._stats(endpoint)["cached"] += 1
+
+    def summary(self, wall_seconds):
+        """JSON-ready totals plus per-endpoint p50/p95/max latency in milliseconds."""
+        endpoints = {}
+        with self._lock:
+            for endpoint, st in sorted(self.endpoints.items()):
+                latencies = sorted(st["latencies"])
+                endpoints[endpoint] = {
+                    "calls": st["calls"],
+                    "errors": st["errors"],
+                    "cached": st["cached"],
+                    "bytes_sent": st["bytes_sent"],
+                    "bytes_received": st["bytes_received"],
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                    "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+                    "total_ms": round(sum(latencies) * 1000, 2),
+                }
+        return {
+            "wall_seconds": round(wall_seconds, 4),
+            "requests": sum(e["calls"] for e in endpoints.values()),
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "cached": sum(e["cached"] for e in endpoints.values()),
+            "bytes_sent": sum(e["bytes_sent"] for e in endpoints.values()),
+            "bytes_received": sum(e["bytes_received"] for e in endpoints.values()),
+            "endpoints": endpoints,
+        }
+
+
+CALL_TIMINGS = CallTimings()
+
+
+def print_timings(summary):
+    """Print a CallTimings.summary() as the `--timings` trailer."""
+    print("\n--- Timings ---", file=sys.stderr)
+    print(f"Wall time {summary['wall_seconds']:.3f}s, {summary['requests']} API request(s) "
+          f"({summary['errors']} failed, {summary['cached']} answered from cache), "
+          f"{summary['bytes_sent']} bytes sent, {summary['bytes_received']} bytes received", file=sys.stderr)
+    if summary["endpoints"]:
+        print(f"{'Endpoint':<26} {'Calls':>6} {'Errors':>7} {'Cached':>7} {'KiB in':>8} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}", file=sys.stderr)
+    for endpoint, st in summary["endpoints"].items():
+        print(f"{endpoint:<26} {st['calls']:>6} {st['errors']:>7} {st['cached']:>7} "
+              f"{st['bytes_received'] / 1024:>8.1f} {st['p50_ms']:>8.1f} {st['p95_ms']:>8.1f} {st['max_ms']:>8.1f}",
+              file=sys.stderr)
+
+
+class CommandResults:
+    """Structured results a command reports for `--output json`, next to its printed text."""
+
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def set(self, key, value):
+        with self._lock:
+            self.data[key] = value
+
+    def append(self, key, value):
+        with self._lock:
+            self.data.setdefault(key, []).append(value)
+
+
+RESULTS = CommandResults()
+
+
+class RateLimiter:
+    """Thread-safe limiter that spaces calls to at most `rate` per second (0 = unlimited)."""
+
+    def __init__(self, rate=0):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            slot = max(time.monotonic(), self._next)
+            self._next = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def run_ordered(func, items, concurrency):
+    """Apply func to items on a bounded thread pool, yielding (item, result) in input order."""
+    concurrency = max(1, concurrency)
+    window = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for item in items:
+            window.append((item, executor.submit(func, item)))
+            # Keep a small backlog queued so workers never idle, but never read ahead unbounded.
+            if len(window) >= concurrency * 2:
+                done_item, future = window.popleft()
+                yield done_item, future.result()
+        while window:
+            done_item, future = window.popleft()
+            yield done_item, future.result()
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    idx = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[idx]
+
+
+def timed_request(host, endpoint, params=None, token=None, timeout=30, method="GET"):
+    """make_request that also returns the call's wall time in seconds."""
+    started = time.perf_counter()
+    resp = make_request(host, endpoint, params, token=token, timeout=timeout, method=method)
+    return resp, time.perf_counter() - started
+
+
+def make_request(host, endpoint, params=None, token=None, timeout=30, method="GET"):
+    """Make an API request to a Technitium instance."""
+    if not token:
+        token = ENV_TOKEN
+    
+    if not token:
+        print(f"Error: No API token provided for {host}{endpoint}. Set TECHNITIUM_TOKEN env var.", file=sys.stderr)
+        return None
+
+    query = ""
+    if params:
+        for k, v in params.items():
+            if isinstance(v, (dict, list)):
+                v = json.dumps(v)
+            query += f"&{k}={urllib.parse.quote(str(v))}"
+    path = f"/api{endpoint}?token={token}{query}"
+
+    cacheable = RESPONSE_CACHE.ttl > 0 and method == "GET" and endpoint in CACHEABLE_ENDPOINTS
+    if cacheable:
+        body, generation = RESPONSE_CACHE.get(host, endpoint + query)
+        if body is not None:
+            CALL_TIMINGS.record_cached(endpoint)
+            return json.loads(body.decode('utf-8'))
+    writing = not cacheable and not is_read_only(endpoint, method)
+    if writing:
+        RESPONSE_CACHE.invalidate(host)
+
+    breaker = RETRY_POLICY.breaker(host)
+    idempotent = is_read_only(endpoint, method) or endpoint in IDEMPOTENT_WRITES
+    attempt = 0
+    probing = False  # this call opened the breaker; its own retries still go out
+    try:
+        while True:
+            if not probing and not breaker.allow():
+                if attempt:
+                    RETRY_POLICY.count(host, "failed")
+                    print(f"Error accessing {host}{endpoint}: circuit open, giving up after {attempt} retries",
+                          file=sys.stderr)
+                else:
+                    RETRY_POLICY.count(host, "short_circuited")
+                return None
+            started = time.perf_counter()
+            try:
+                body = get_pool(host).request(method, path, timeout=timeout, idempotent=idempotent,
+                                              connect_timeout=min(timeout, RETRY_POLICY.connect_timeout))
+            except Exception as e:
+                CALL_TIMINGS.record(endpoint, time.perf_counter() - started, len(path), ok=False)
+                retryable = is_transient(e) and (idempotent or isinstance(e, ConnectError))
+                if isinstance(e, ConnectError):
+                    # Open the breaker before backing off, so other calls to this
+                    # host fail fast while this one retries.
+                    probing = breaker.trip() or probing
+                    retryable = retryable and probing
+                else:
+                    breaker.record(not is_transient(e))
+                if retryable and attempt < RETRY_POLICY.retries:
+                    attempt += 1
+                    RETRY_POLICY.count(host, "retried")
+                    time.sleep(RETRY_POLICY.delay(attempt))
+                    continue
+                RETRY_POLICY.count(host, "failed")
+                print(f"Error accessing {host}{endpoint}: {e}", file=sys.stderr)
+                return None
+            CALL_TIMINGS.record(endpoint, time.perf_counter() - started, len(path), len(body))
+            breaker.record(True)
+            break
+    finally:
+        if writing:
+            # Reads that ran while the write was in flight may have cached pre-write data.
+            RESPONSE_CACHE.invalidate(host, count=False)
+
+    try:
+        resp = json.loads(body.decode('utf-8'))
+    except ValueError as e:
+        print(f"Error accessing {host}{endpoint}: invalid JSON response: {e}", file=sys.stderr)
+        return None
+    if cacheable and resp.get('status') == 'ok':
+        RESPONSE_CACHE.put(host, endpoint + query, body, generation)
+    return resp
+
+
+def print_rows(rows, columns, fmt="table", out=None):
+    """Render a list of dict rows as an aligned table, JSON or CSV."""
+    out = out or sys.stdout
+    if fmt == "json":
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+        return
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+
+    cells = [["" if row.get(col) is None else str(row.get(col)) for col in columns] for row in rows]
+    widths = [max([len(col)] + [len(r[i]) for r in cells]) for i, col in enumerate(columns)]
+    print("  ".join(col.upper().ljust(w) for col, w in zip(columns, widths)), file=out)
+    print("  ".join("-" * w for w in widths), file=out)
+    for r in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)), file=out)
+
+
+def discover_nodes(primary, secondary, token=None, timeout=5):
+    """Return cluster nodes from the primary's clusterNodes setting.
+
+    Each node is a dict with name/address/state. Falls back to the configured
+    primary/secondary pair when clustering info is unavailable. Also returns
+    the primary's timed /settings/get result so callers need not fetch it again.
+    """
+    settings = timed_request(primary, "/settings/get", token=token, timeout=timeout)
+    resp = settings[0]
+    nodes = []
+    if resp and resp.get('status') == 'ok':
+        for node in resp.get('response', {}).get('clusterNodes', []) or []:
+            address = (node.get('ipAddresses') or [None])[0]
+            if address:
+                nodes.append({"name": node.get('name', address), "address": address, "state": node.get('state', '?')})
+    if not nodes:
+        nodes = [
+            {"name": "primary", "address": primary, "state": "?"},
+            {"name": "secondary", "address": secondary, "state": "?"},
+        ]
+    return nodes, settings
+
+
+def zone_list_page(resp):
+    """Return (total_zones, zones, total_pages) from a /zones/list response."""
+    body = (resp or {}).get('response', {})
+    zones = body.get('zones', body.get('data', [])) or []
+    total = body.get('totalZones', body.get('totalRecords', len(zones)))
+    return total, zones, body.get('totalPages', 1)
+
+
+def iter_zones(host, token=None, window=4, per_page=100, timeout=30):
+    """Stream every zone from /zones/list, fetching pages after the first concurrently."""
+    def fetch_page(page):
+        resp = make_request(host, "/zones/list", {"pageNumber": page, "recordsPerPage": per_page},
+                            token=token, timeout=timeout)
+        if not resp or resp.get('status') != 'ok':
+            raise RuntimeError(f"Failed to list zones page {page} on {host}")
+        return resp
+
+    _, zones, total_pages = zone_list_page(fetch_page(1))
+    yield from zones
+    for _, resp in run_ordered(fetch_page, range(2, total_pages + 1), window):
+        yield from zone_list_page(resp)[1]
+
+
+# rData field holding the primary value of each record type in /zones/records/* calls.
+RDATA_FIELDS = {
+    "A": "ipAddress",
+    "AAAA": "ipAddress",
+    "CNAME": "cname",
+    "TXT": "text",
+    "PTR": "ptrName",
+    "NS": "nameServer",
+    "FWD": "forwarder",
+}
+
+
+def api_record_value(record):
+    """Extract the comparable value of a record returned by /zones/records/get."""
+    rdata = record.get('rData') or {}
+    field = RDATA_FIELDS.get(record.get('type'))
+    if field and field in rdata:
+        return str(rdata[field])
+    return json.dumps(rdata, sort_keys=True)
+
+
+def record_key(fqdn, rtype, value):
+    return (fqdn.rstrip(".").lower(), rtype, value.rstrip(".").lower())
+
+
+def fetch_zone_records(host, zone, token=None):
+    """Fetch every record in a zone with a single /zones/records/get call."""
+    resp = make_request(host, "/zones/records/get", {"domain": zone, "zone": zone, "listZone": "true"}, token=token)
+    if not resp or resp.get('status') != 'ok':
+        return None
+    return resp.get('response', {}).get('records', [])
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Technitium Manager Benchmarks
+
+Reproducible performance checks for manage.py that run on a laptop.
+
+Usage:
+  python3 benchmark.py sketches [--entries N]
+  python3 benchmark.py api [--sizes 1000,10000] [--save FILE] [--compare FILE]
+
+Commands:
+  sketches           Compare exact vs. approximate analyze counters on synthetic logs
+  api                Time manage.py status/import/analyze against a local fake API
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+import fake_server
+import sketches
+
+MANAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "manage.py")
+
+
+def synthetic_log_entries(count, seed=42, popular=5000, clients=500, noise=0.3):
+    """Yield query-log-shaped dicts: Zipf-ish popular names plus random-subdomain noise."""
+    rnd = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(popular)]
+    names = [f"svc{i}.example.com" for i in range(popular)]
+    client_ips = [f"10.{i // 250}.{i % 250}.{rnd.randint(1, 254)}" for i in range(clients)]
+    client_weights = [1.0 / (rank + 1) for rank in range(clients)]
+
+    batch = 10000
+    produced = 0
+    while produced < count:
+        n = min(batch, count - produced)
+        qnames = rnd.choices(names, weights, k=n)
+        ips = rnd.choices(client_ips, client_weights, k=n)
+        for qname, ip in zip(qnames, ips):
+            if rnd.random() < noise:
+                # DGA / CDN style long tail: every name is unique.
+                qname = f"{rnd.getrandbits(48):012x}.cdn.example.net"
+            yield {"qname": qname, "clientIpAddress": ip, "rcode": "NxDomain", "responseType": "Recursive"}
+        produced += n
+
+
+def run_counters(mode, entries, capacity):
+    domains = sketches.make_counter(mode, capacity)
+    clients = sketches.make_counter(mode, capacity)
+    for entry in entries:
+        domains.add(entry["qname"])
+        clients.add(entry["clientIpAddress"])
+    return domains, clients
+
+
+def bench_sketches(args):
+    """Time and peak memory for exact vs. approx counters over the same stream."""
+    print(f"--- Sketch benchmark: {args.entries:,} synthetic log entries ---")
+    # Materialize once so generation cost is excluded from the timings.
+    entries = list(synthetic_log_entries(args.entries, seed=args.seed))
+    results = {}
+
+    for mode in ("exact", "approx"):
+        started = time.perf_counter()
+        domains, clients = run_counters(mode, entries, args.sketch_size)
+        elapsed = time.perf_counter() - started
+
+        # Memory is measured in a second, streamed pass (fresh key strings, as
+        # when reading from the API) because tracemalloc distorts timings.
+        tracemalloc.start()
+        run_counters(mode, synthetic_log_entries(args.entries, seed=args.seed), args.sketch_size)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        results[mode] = (domains, clients)
+        print(f"{mode:<7} time={elapsed:6.2f}s  rate={len(entries) / elapsed:>10,.0f}/s  "
+              f"peak={peak / 2**20:7.1f} MiB  distinct domains={domains.distinct():,}  "
+              f"distinct clients={clients.distinct():,}")
+
+    exact_top = [name for name, _ in results["exact"][0].most_common(args.limit)]
+    approx_top = [name for name, _ in results["approx"][0].most_common(args.limit)]
+    overlap = len(set(exact_top) & set(approx_top))
+    print(f"Top-{args.limit} domain overlap (approx vs exact): {overlap}/{len(exact_top)}")
+
+
+def write_teleporter_zip(path, records):
+    """A Teleporter export whose custom.list holds `records` A records."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("etc/pihole/custom.list",
+                    "".join(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255} bench{i}\n" for i in range(records)))
+
+
+def api_scenarios(args, size, workdir):
+    """(command, manage.py arguments, items processed per run, unit) for one size."""
+    zip_path = os.path.join(workdir, f"teleporter-{size}.zip")
+    write_teleporter_zip(zip_path, size)
+    return {
+        "status": (["status"], 1, "runs"),
+        "import": (["import", "--zip", zip_path, "--zone", "zone0.internal",
+                    "--concurrency", str(args.concurrency)], size, "records"),
+        "analyze": (["analyze", "--hours", "24", "--window", str(args.window)], size, "entries"),
+    }
+
+
+def bench_api(args):
+    """Run manage.py end to end (startup included) against the fake API at several sizes."""
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    commands = [c for c in args.commands.split(",") if c]
+    print(f"--- API benchmark: {', '.join(commands)} at sizes {sizes}, "
+          f"{args.latency_ms:g}ms latency, page size {args.page_size}, median of {args.repeat} ---")
+    print(f"{'command':<8} {'size':>8} {'seconds':>8} {'rate':>16} {'requests':>9}")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in sizes:
+            state = fake_server.FakeTechnitium(zones=10, log_entries=size, max_page_size=args.page_size,
+                                               latency_ms=args.latency_ms)
+            server, address = fake_server.start_server(state)
+            try:
+                scenarios = api_scenarios(args, size, workdir)
+                for command in commands:
+                    argv, items, unit = scenarios[command]
+                    timings = []
+                    for _ in range(args.repeat):
+                        state.reset()
+                        started = time.perf_counter()
+                        proc = subprocess.run(
+                            [sys.executable, MANAGE, "--token", "bench", "--primary", address,
+                             "--secondary", address] + argv,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                        timings.append(time.perf_counter() - started)
+                        if proc.returncode:
+                            print(f"{command} failed (exit {proc.returncode}):\n{proc.stderr}", file=sys.stderr)
+                            return 1
+                    seconds = statistics.median(timings)
+                    rate = items / seconds
+                    results[f"{command}@{size}"] = rate
+                    print(f"{command:<8} {size:>8} {seconds:>8.3f} {rate:>10,.0f} {unit + '/s':<6}"
+                          f"{sum(state.requests.values()):>8}")
+            finally:
+                server.shutdown()
+                server.server_close()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"Saved results to {args.save}")
+    if args.compare:
+        return compare_results(results, args.compare, args.tolerance)
+    return 0
+
+
+def compare_results(results, baseline_path, tolerance):
+    """Print rate changes against a saved run; returns 1 if any rate dropped by more than tolerance."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for key, rate in sorted(results.items()):
+        if key not in baseline:
+            continue
+        change = rate / baseline[key] - 1
+        flag = "REGRESSION" if change < -tolerance else "ok"
+        regressions += flag != "ok"
+        print(f"{key:<16} {change:+7.1%}  {flag}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Technitium Manager Benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    sk_parser = subparsers.add_parser("sketches", help="Exact vs. approximate analyze counters")
+    sk_parser.add_argument("--entries", type=int, default=1_000_000, help="Synthetic log entries (default: 1000000)")
+    sk_parser.add_argument("--sketch-size", type=int, default=1000, help="Heavy hitters tracked (default: 1000)")
+    sk_parser.add_argument("--limit", type=int, default=20, help="Top-N compared between modes (default: 20)")
+    sk_parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+
+    api_parser = subparsers.add_parser("api", help="End-to-end manage.py timings against a fake API")
+    api_parser.add_argument("--sizes", default="1000,10000",
+                            help="Comma-separated record/log entry counts (default: 1000,10000)")
+    api_parser.add_argument("--commands", default="status,import,analyze",
+                            help="Comma-separated scenarios (default: status,import,analyze)")
+    api_parser.add_argument("--latency-ms", type=float, default=1.0, help="Fake per-request latency (default: 1)")
+    api_parser.add_argument("--page-size", type=int, default=1000, help="Fake API max page size (default: 1000)")
+    api_parser.add_argument("--concurrency", type=int, default=8, help="import --concurrency (default: 8)")
+    api_parser.add_argument("--window", type=int, default=4, help="analyze --window (default: 4)")
+    api_parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is reported (default: 3)")
+    api_parser.add_argument("--save", metavar="FILE", help="Write rates to a JSON baseline file")
+    api_parser.add_argument("--compare", metavar="FILE", help="Compare rates with a saved baseline; exit 1 on regression")
+    api_parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Allowed rate drop before --compare fails (default: 0.2 = 20%%)")
+
+    args = parser.parse_args()
+
+    if args.command == "sketches":
+        bench_sketches(args)
+    elif args.command == "api":
+        return bench_api(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Blocklist download cache, parsing and overlap analysis.
+
+Each list is downloaded once into a cache directory (revalidated with
+ETag / Last-Modified), parsed line by line (hosts, plain domain and Adblock
+`||domain^` formats) and deduplicated into a sorted one-domain-per-line file.
+Overlap is then computed with a streaming k-way merge of those sorted files,
+so only one list is ever held in memory at a time.
+"""
+
+import hashlib
+import heapq
+import json
+import os
+import shutil
+import time
+import urllib.error
+import urllib.request
+from itertools import groupby
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "technitium", "blocklists"
+)
+MANIFEST = "manifest.json"
+
+# Addresses used by hosts-format lists to sink a name.
+SINK_ADDRESSES = {"0.0.0.0", "127.0.0.1", "::", "::1", "0", "255.255.255.255"}
+NOT_DOMAINS = {"localhost", "localhost.localdomain", "local", "broadcasthost", "ip6-localhost", "ip6-loopback"}
+
+
+class BlocklistCache:
+    """Raw and sorted copies of blocklists, keyed by URL."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.manifest_path = os.path.join(directory, MANIFEST)
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def save(self):
+        tmp = f"{self.manifest_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def path(self, url, suffix="raw"):
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.directory, f"{digest}.{suffix}")
+
+    def urls(self):
+        return sorted(url for url in self.manifest if os.path.exists(self.path(url)))
+
+    def fetch(self, url, timeout=60):
+        """Download url into the cache unless the cached copy is still current.
+
+        Returns "downloaded", "not-modified", or raises on failure.
+        """
+        entry = self.manifest.get(url, {})
+        raw_path = self.path(url)
+        request = urllib.request.Request(url, headers={"User-Agent": "technitium-manage/1.0"})
+        if os.path.exists(raw_path):
+            if entry.get("etag"):
+                request.add_header("If-None-Match", entry["etag"])
+            if entry.get("last_modified"):
+                request.add_header("If-Modified-Since", entry["last_modified"])
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                tmp = f"{raw_path}.part"
+                with open(tmp, "wb") as out:
+                    shutil.copyfileobj(response, out, 1 << 20)
+                os.replace(tmp, raw_path)
+                headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return "not-modified"
+            raise
+        self.manifest[url] = {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        return "downloaded"
+
+
+def parse_line(line):
+    """Return the domains named on one blocklist line (hosts, plain or Adblock syntax)."""
+    line = line.strip()
+    if not line or line[0] in "#![":
+        return []
+    if line.startswith("@@"):
+        # Adblock exception rule: allows, not blocks.
+        return []
+    if line.startswith("||"):
+        rule = line[2:]
+        end = len(rule)
+        for sep in "^$/":
+            idx = rule.find(sep)
+            if idx != -1:
+                end = min(end, idx)
+        name = rule[:end]
+        return [name] if "*" not in name and rule[end:end + 1] in ("^", "$", "") else []
+
+    parts = line.split("#", 1)[0].split()
+    if not parts:
+        return []
+    if parts[0] in SINK_ADDRESSES:
+        parts = parts[1:]
+    elif len(parts) > 1:
+        return []
+    return parts
+
+
+def normalize_domain(name):
+    name = name.strip().strip(".").lower()
+    if not name or name in NOT_DOMAINS or "." not in name or "/" in name or "*" in name:
+        return None
+    return name
+
+
+def build_sorted(raw_path, sorted_path):
+    """Parse a raw list into a sorted, deduplicated file. Returns (entries, distinct)."""
+    if (os.path.exists(sorted_path) and os.path.exists(f"{sorted_path}.meta")
+            and os.path.getmtime(sorted_path) >= os.path.getmtime(raw_path)):
+        with open(f"{sorted_path}.meta", encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta["entries"], meta["distinct"]
+
+    entries = 0
+    domains = set()
+    with open(raw_path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            for name in parse_line(line):
+                name = normalize_domain(name)
+                if name:
+                    entries += 1
+                    domains.add(name)
+
+    tmp = f"{sorted_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        out.writelines(f"{name}\n" for name in sorted(domains))
+    os.replace(tmp, sorted_path)
+    with open(f"{sorted_path}.meta", "w", encoding="utf-8") as f:
+        json.dump({"entries": entries, "distinct": len(domains)}, f)
+    return entries, len(domains)
+
+
+def _read_sorted(path, index):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield line.rstrip("\n"), index
+
+
+def merge_overlap(sorted_paths):
+    """Stream-merge sorted domain files.
+
+    Returns (union, unique, overlap) where unique[i] counts domains only in list
+    i and overlap[i][j] counts domains shared by lists i and j.
+    """
+    n = len(sorted_paths)
+    unique = [0] * n
+    overlap = [[0] * n for _ in range(n)]
+    union = 0
+    streams = [_read_sorted(path, i) for i, path in enumerate(sorted_paths)]
+    for _, group in groupby(heapq.merge(*streams), key=lambda item: item[0]):
+        owners = [index for _, index in group]
+        union += 1
+        if len(owners) == 1:
+            unique[owners[0]] += 1
+        for i in owners:
+            for j in owners:
+                overlap[i][j] += 1
+    return union, unique, overlap
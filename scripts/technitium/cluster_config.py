@@ -0,0 +1,168 @@
+"""
+Desired-state cluster configuration for `manage.py apply`.
+
+A cluster.toml file describes the settings, TSIG keys and zones each node
+should have. This module loads and validates it and computes the minimal
+difference against what a node currently reports, so `apply` only sends the
+settings and zone operations that actually change something.
+
+Example:
+
+    nodes = ["192.168.1.7", "192.168.1.8"]   # first node is the primary
+
+    [settings]
+    forwarders = ["9.9.9.9", "149.112.112.112"]
+    enableBlocking = true
+    blockListUrls = ["https://big.oisd.nl/"]
+
+    [[tsig_keys]]
+    name = "external-dns-key"
+    secret_env = "EXTERNAL_DNS_TSIG_SECRET"
+
+    [[zones]]
+    name = "torquasmvo.internal"
+
+    [[zones]]
+    name = "1.168.192.in-addr.arpa"
+    type = "Forwarder"
+    forwarder = "192.168.1.1"
+    nodes = "all"
+"""
+
+import os
+
+try:
+    import tomllib
+except ModuleNotFoundError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+ZONE_TYPES = ("Primary", "Forwarder")
+ZONE_SCOPES = ("primary", "all")
+
+
+class ConfigError(ValueError):
+    """Raised for an invalid desired-state file."""
+
+
+def load(path, default_nodes):
+    """Parse and validate a cluster.toml file into a plain dict."""
+    if tomllib is None:
+        raise ConfigError("reading TOML requires Python 3.11+ or the 'tomli' package")
+    with open(path, "rb") as f:
+        try:
+            raw = tomllib.load(f)
+        except tomllib.TOMLDecodeError as e:
+            raise ConfigError(f"{path}: {e}") from e
+
+    nodes = raw.get("nodes") or list(default_nodes)
+    if not isinstance(nodes, list) or not all(isinstance(n, str) and n for n in nodes):
+        raise ConfigError("'nodes' must be a list of host names or addresses")
+
+    settings = raw.get("settings", {})
+    if not isinstance(settings, dict):
+        raise ConfigError("[settings] must be a table")
+    if "tsigKeys" in settings:
+        raise ConfigError("declare TSIG keys with [[tsig_keys]], not settings.tsigKeys")
+
+    tsig_keys = []
+    for entry in raw.get("tsig_keys", []):
+        name = entry.get("name")
+        secret = entry.get("secret")
+        if entry.get("secret_env"):
+            secret = os.environ.get(entry["secret_env"])
+            if not secret:
+                raise ConfigError(f"TSIG key '{name}': environment variable {entry['secret_env']} is not set")
+        if not name or not secret:
+            raise ConfigError("each [[tsig_keys]] entry needs 'name' and 'secret' or 'secret_env'")
+        tsig_keys.append({
+            "keyName": name,
+            "sharedSecret": secret,
+            "algorithmName": entry.get("algorithm", "hmac-sha256"),
+        })
+
+    zones = []
+    for entry in raw.get("zones", []):
+        zone = {
+            "name": str(entry.get("name", "")).rstrip(".").lower(),
+            "type": entry.get("type", "Primary"),
+            "forwarder": entry.get("forwarder"),
+            "nodes": entry.get("nodes", "primary"),
+        }
+        if not zone["name"]:
+            raise ConfigError("each [[zones]] entry needs a 'name'")
+        if zone["type"] not in ZONE_TYPES:
+            raise ConfigError(f"zone {zone['name']}: type must be one of {', '.join(ZONE_TYPES)}")
+        if zone["type"] == "Forwarder" and not zone["forwarder"]:
+            raise ConfigError(f"zone {zone['name']}: Forwarder zones need 'forwarder'")
+        if zone["nodes"] not in ZONE_SCOPES:
+            raise ConfigError(f"zone {zone['name']}: nodes must be one of {', '.join(ZONE_SCOPES)}")
+        zones.append(zone)
+
+    return {"nodes": nodes, "settings": settings, "tsig_keys": tsig_keys, "zones": zones}
+
+
+def zones_for_node(config, node):
+    primary = config["nodes"][0]
+    return [z for z in config["zones"] if z["nodes"] == "all" or node == primary]
+
+
+def normalize(value):
+    """Canonical comparable form of a setting value (lists vs comma strings, bools vs "true")."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(normalize(v)) for v in value]
+    if isinstance(value, str) and "," in value:
+        return [part.strip() for part in value.split(",") if part.strip()]
+    return str(value)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value] if value not in ("", []) else []
+
+
+def settings_diff(desired, current):
+    """Return [(key, current, desired)] for settings that differ."""
+    changes = []
+    for key, want in desired.items():
+        have = current.get(key)
+        want_n, have_n = normalize(want), normalize(have)
+        if isinstance(want_n, list) or isinstance(have_n, list):
+            want_n, have_n = _as_list(want_n), _as_list(have_n)
+        if want_n != have_n:
+            changes.append((key, have, want))
+    return changes
+
+
+def tsig_diff(desired_keys, current_keys):
+    """Return (merged key list, [(action, keyName)]) for TSIG keys to add or update.
+
+    Keys not mentioned in the desired state are kept, since /settings/set
+    replaces the whole list.
+    """
+    merged = [dict(k) for k in (current_keys or [])]
+    by_name = {k.get("keyName"): k for k in merged}
+    actions = []
+    for key in desired_keys:
+        have = by_name.get(key["keyName"])
+        if have is None:
+            merged.append(dict(key))
+            actions.append(("add", key["keyName"]))
+        elif (have.get("sharedSecret"), have.get("algorithmName")) != (key["sharedSecret"], key["algorithmName"]):
+            have.update(key)
+            actions.append(("update", key["keyName"]))
+    return merged, actions
+
+
+def encode_setting(value):
+    """Encode a desired value the way /settings/set expects it in a query string."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    return value
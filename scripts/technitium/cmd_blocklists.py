@@ -0,0 +1,113 @@
+"""`blocklists analyze`: per-list size, unique contribution and overlap."""
+
+import os
+
+import blocklists
+from api import RESULTS, make_request, print_rows, run_ordered
+
+
+def configured_blocklists(settings_resp):
+    """Return blockListUrls from a /settings/get response as a list."""
+    urls = (settings_resp or {}).get('response', {}).get('blockListUrls') or []
+    if isinstance(urls, str):
+        urls = [u.strip() for u in urls.split(',') if u.strip()]
+    return urls
+
+
+def add_blocklists_arguments(parser):
+    subparsers = parser.add_subparsers(dest="blocklists_command", required=True)
+    analyze = subparsers.add_parser("analyze", help="Per-list unique contribution and overlap")
+    analyze.add_argument("--cache-dir", default=blocklists.DEFAULT_CACHE_DIR,
+                         help=f"Download cache directory (default: {blocklists.DEFAULT_CACHE_DIR})")
+    analyze.add_argument("--offline", action="store_true", help="Only use cached files; no network access")
+    analyze.add_argument("--url", action="append", help="Analyze this URL instead of the configured lists (repeatable)")
+    analyze.add_argument("--concurrency", type=int, default=4, help="Parallel downloads (default: 4)")
+    analyze.add_argument("--min-unique", type=float, default=1.0,
+                         help="Flag lists with less than this %% of unique domains (default: 1.0)")
+
+
+def cmd_blocklists(args):
+    if args.blocklists_command == "analyze":
+        cmd_blocklists_analyze(args)
+
+
+def cmd_blocklists_analyze(args):
+    """Report per-list size, unique contribution and overlap of blocklists."""
+    cache = blocklists.BlocklistCache(args.cache_dir)
+
+    if args.url:
+        urls = args.url
+    elif args.offline:
+        urls = cache.urls()
+    else:
+        resp = make_request(args.primary, "/settings/get", token=args.token)
+        if not resp or resp.get('status') != 'ok':
+            print("Failed to get settings; use --offline to analyze cached lists.")
+            return
+        urls = configured_blocklists(resp)
+
+    if not urls:
+        print("No blocklists to analyze.")
+        return
+    print(f"--- Analyzing {len(urls)} blocklist(s) (cache: {args.cache_dir}) ---")
+
+    def prepare(url):
+        raw_path = cache.path(url)
+        status = "cached"
+        if not args.offline:
+            try:
+                status = cache.fetch(url)
+            except Exception as e:
+                status = f"fetch failed ({e}); using cache" if os.path.exists(raw_path) else f"fetch failed ({e})"
+        if not os.path.exists(raw_path):
+            return status, None
+        return status, blocklists.build_sorted(raw_path, cache.path(url, "sorted"))
+
+    available = []
+    for url, (status, counts) in run_ordered(prepare, urls, args.concurrency):
+        print(f"{status:<14} {url}")
+        RESULTS.append("downloads", {"url": url, "status": status})
+        if counts:
+            available.append((url, counts))
+    if not args.offline:
+        cache.save()
+    if not available:
+        print("No blocklist data available.")
+        return
+
+    union, unique, overlap = blocklists.merge_overlap([cache.path(url, "sorted") for url, _ in available])
+
+    rows = []
+    for i, (url, (entries, distinct)) in enumerate(available):
+        share = unique[i] / distinct * 100 if distinct else 0.0
+        rows.append({
+            "list": f"#{i + 1}",
+            "entries": entries,
+            "distinct": distinct,
+            "unique": unique[i],
+            "unique_pct": round(share, 1),
+            "verdict": "redundant" if share < args.min_unique else "keep",
+            "url": url,
+        })
+    print()
+    print_rows(rows, ["list", "entries", "distinct", "unique", "unique_pct", "verdict", "url"])
+    total = sum(distinct for _, (_, distinct) in available)
+    RESULTS.set("lists", rows)
+    RESULTS.set("union", union)
+    RESULTS.set("overlap_pct", [[round(overlap[i][j] / distinct * 100 if distinct else 0.0, 1)
+                                 for j in range(len(available))]
+                                for i, (_, (_, distinct)) in enumerate(available)])
+    print(f"\nUnion: {union} distinct domains ({total - union} duplicate entries across lists)")
+
+    print("\nOverlap (% of row list also present in column list):")
+    header = "      " + "".join(f"{f'#{j + 1}':>7}" for j in range(len(available)))
+    print(header)
+    for i, (_, (_, distinct)) in enumerate(available):
+        cells = "".join(f"{(overlap[i][j] / distinct * 100 if distinct else 0):>6.0f}%" for j in range(len(available)))
+        print(f"{f'#{i + 1}':<6}{cells}")
+
+    redundant = [row["url"] for row in rows if row["verdict"] == "redundant"]
+    if redundant:
+        print(f"\nLists contributing < {args.min_unique}% unique domains (candidates to drop):")
+        for url in redundant:
+            print(f"- {url}")
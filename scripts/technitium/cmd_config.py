@@ -0,0 +1,404 @@
+"""Node configuration commands: setup, zones, forwarders, external-dns and `apply`."""
+
+import sys
+import time
+from collections import Counter
+
+import cluster_config
+from api import (
+    DEFAULT_ZONE,
+    RESULTS,
+    api_record_value,
+    fetch_zone_records,
+    get_pool,
+    iter_zones,
+    make_request,
+    run_ordered,
+)
+
+
+def add_setup_arguments(parser):
+    parser.add_argument("--zone", default=DEFAULT_ZONE, help="Primary Zone Name")
+
+
+def cmd_setup(args):
+    """Run initial setup on Primary."""
+    print(f"--- Setting up Primary ({args.primary}) ---")
+
+    # 1. Get Current Settings
+    print("Fetching current settings...")
+    settings = make_request(args.primary, "/settings/get", token=args.token)
+    if not settings or settings.get('status') != 'ok':
+        print("Failed to get settings.")
+        RESULTS.set("settings", "failed to read")
+        return
+
+    current_config = settings.get('response', {})
+    
+    # 2. Prepare Blocklists
+    new_blocklists = [
+        "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts",
+        "https://big.oisd.nl/",
+        "https://adaway.org/hosts.txt",
+        "https://v.firebog.net/hosts/AdguardDNS.txt"
+    ]
+    
+    existing_urls = current_config.get('blockListUrls', [])
+    if isinstance(existing_urls, str):
+        existing_urls = [u.strip() for u in existing_urls.split(',')]
+    
+    final_urls = list(existing_urls)
+    for url in new_blocklists:
+        if url not in final_urls:
+            final_urls.append(url)
+            
+    final_urls_str = ",".join(final_urls)
+
+    # 3. Apply Settings
+    update_params = {
+        "forwarders": "9.9.9.9,149.112.112.112", # Quad9 Default
+        "enableBlocking": "true",
+        "blockListUrls": final_urls_str,
+        "enableQNameMinimization": "true",
+        "enableDnsSec": "true"
+    }
+
+    print(f"Applying settings (Blocklists: {len(final_urls)})...")
+    resp = make_request(args.primary, "/settings/set", update_params, token=args.token)
+    if resp and resp.get('status') == 'ok':
+        print("Settings configured successfully.")
+        RESULTS.set("settings", "configured")
+    else:
+        print(f"Failed to apply settings: {resp}")
+        RESULTS.set("settings", "failed")
+    RESULTS.set("blocklists", len(final_urls))
+
+    # 4. Create Zone
+    print(f"Ensuring zone exists: {args.zone}")
+    resp = make_request(args.primary, "/zones/create", {"zone": args.zone, "type": "Primary"}, token=args.token)
+    if resp and resp.get('status') == 'ok':
+        print("Zone created.")
+        RESULTS.set("zone", "created")
+    elif resp and "Zone already exists" in resp.get('errorMessage', ''):
+        print("Zone already exists (OK).")
+        RESULTS.set("zone", "exists")
+    else:
+        print(f"Failed to create zone: {resp}")
+        RESULTS.set("zone", "failed")
+
+
+def add_create_zone_arguments(parser):
+    parser.add_argument("--zone", required=True, help="Zone name (e.g., localhost)")
+
+
+def cmd_create_zone(args):
+    """Create a new Primary zone."""
+    print(f"--- Creating Zone '{args.zone}' on Primary ({args.primary}) ---")
+    resp = make_request(args.primary, "/zones/create", {"zone": args.zone, "type": "Primary"}, token=args.token)
+    ok = bool(resp and resp.get('status') == 'ok')
+    if ok:
+        print(f"Zone '{args.zone}' created successfully.")
+    elif resp:
+        print(f"Failed to create zone: {resp.get('errorMessage')}")
+    else:
+        print("Failed to communicate with API.")
+    RESULTS.set("zone", args.zone)
+    RESULTS.set("created", ok)
+    if not ok:
+        RESULTS.set("error", resp.get('errorMessage') if resp else "no response")
+
+
+def add_external_dns_arguments(parser):
+    parser.add_argument("--zone", default=DEFAULT_ZONE, help="Zone to configure")
+    parser.add_argument("--secret", help="TSIG Shared Secret (required if key missing)")
+
+
+def cmd_external_dns(args):
+    """Configure External-DNS (TSIG Key + Zone Options)."""
+    print(f"--- Configuring External-DNS on Primary ({args.primary}) ---")
+
+    # 1. Get Current Settings (for TSIG Keys)
+    print("Fetching current settings...")
+    settings = make_request(args.primary, "/settings/get", token=args.token)
+    if not settings or settings.get('status') != 'ok':
+        print("Failed to get settings.")
+        RESULTS.set("tsig_key", "failed to read settings")
+        return
+
+    current_config = settings.get('response', {})
+    current_keys = current_config.get('tsigKeys', [])
+    
+    # 2. Add TSIG Key
+    key_name = "external-dns-key"
+    exists = False
+    for k in current_keys:
+        if k['keyName'] == key_name:
+            exists = True
+            print(f"TSIG Key '{key_name}' already exists.")
+            RESULTS.set("tsig_key", "exists")
+            break
+    
+    if not exists:
+        if not args.secret:
+            print(f"Error: TSIG Key '{key_name}' missing and no --secret provided.")
+            RESULTS.set("tsig_key", "missing")
+            return
+
+        print(f"Adding '{key_name}'...")
+        new_key = {
+            "keyName": key_name,
+            "sharedSecret": args.secret,
+            "algorithmName": "hmac-sha256"
+        }
+        current_keys.append(new_key)
+        
+        # Update Settings
+        # Note: We must send the FULL list of keys to avoid overwriting existing ones.
+        # /settings/set accepts 'tsigKeys' as a JSON string.
+        resp = make_request(args.primary, "/settings/set", {"tsigKeys": current_keys}, token=args.token, method="POST")
+        if resp and resp.get('status') == 'ok':
+            print("TSIG Key added successfully.")
+            RESULTS.set("tsig_key", "added")
+        else:
+            print(f"Failed to add TSIG Key: {resp}")
+            RESULTS.set("tsig_key", "failed")
+            return
+
+    # 3. Configure Zone Options
+    print(f"Configuring Zone '{args.zone}' options...")
+    
+    policy = f"{key_name}|*.{args.zone}|A,AAAA,TXT"
+    params = {
+        "zone": args.zone,
+        "update": "Allow",
+        "updateSecurityPolicies": policy,
+        "zoneTransfer": "Allow",
+        "zoneTransferTsigKeyNames": key_name
+    }
+    
+    # Use zones/options/set (verified working endpoint)
+    resp = make_request(args.primary, "/zones/options/set", params, token=args.token, method="POST")
+    
+    if resp and resp.get('status') == 'ok':
+        print("Zone options configured successfully (Update: Allow, Transfer: Allow).")
+        RESULTS.set("zone_options", "configured")
+    else:
+        print(f"Failed to configure zone options: {resp}")
+        RESULTS.set("zone_options", "failed")
+
+
+def add_forwarders_arguments(parser):
+    parser.add_argument("forwarders", help="Comma-separated IPs (e.g., 9.9.9.9,1.1.1.1)")
+
+
+def cmd_forwarders(args):
+    """Update upstream forwarders."""
+    print(f"--- Updating Forwarders on Primary ({args.primary}) ---")
+    print(f"New Forwarders: {args.forwarders}")
+
+    resp = make_request(args.primary, "/settings/set", {"forwarders": args.forwarders}, token=args.token)
+    ok = bool(resp and resp.get('status') == 'ok')
+    if ok:
+        print("Forwarders updated successfully.")
+    else:
+        print(f"Failed to update forwarders: {resp}")
+    RESULTS.set("forwarders", [f for f in args.forwarders.split(",") if f])
+    RESULTS.set("updated", ok)
+
+
+def reconcile_forwarder_zones(host, zones, target, token=None, stats=None):
+    """Create missing forwarder zones and retarget existing ones in place; returns output lines.
+
+    Calls the node accepted are counted in stats["changes"], rejected ones in
+    stats["failed"].
+    """
+    stats = Counter() if stats is None else stats
+    existing = {z.get('name', '').rstrip(".").lower(): z.get('type') for z in iter_zones(host, token=token)}
+    lines = []
+    for zone in zones:
+        if zone not in existing:
+            resp = make_request(host, "/zones/create", {"zone": zone, "type": "Forwarder", "forwarder": target},
+                                token=token)
+            ok = resp and resp.get('status') == 'ok'
+            stats["changes" if ok else "failed"] += 1
+            lines.append(f"+ zone {zone} -> {target}: {'OK' if ok else f'FAILED {resp}'}")
+            continue
+        if existing[zone] != "Forwarder":
+            lines.append(f"! zone {zone} exists as a {existing[zone]} zone; left unchanged")
+            continue
+        ops = forwarder_zone_ops(host, zone, target, token=token)
+        if not ops:
+            lines.append(f"= zone {zone} already forwards to {target}")
+        for description, endpoint, params in ops:
+            resp = make_request(host, endpoint, params, token=token, method="POST")
+            ok = resp and resp.get('status') == 'ok'
+            stats["changes" if ok else "failed"] += 1
+            lines.append(f"{description}: {'OK' if ok else f'FAILED {resp}'}")
+    return lines
+
+
+def add_reverse_dns_arguments(parser):
+    parser.add_argument("--target", default="192.168.1.1", help="Target DNS for forwarding (UDM Pro)")
+
+
+def cmd_reverse_dns(args):
+    """Reconcile Reverse DNS (PTR) forwarder zones on ALL nodes without recreating them."""
+    ptr_zones = ["1.168.192.in-addr.arpa", "0.0.10.in-addr.arpa"]
+    hosts = [args.primary, args.secondary]
+    print(f"--- Reconciling reverse DNS zones on {len(hosts)} node(s) -> {args.target} ---")
+
+    def reconcile(host):
+        pool = get_pool(host)
+        calls_before = pool.requests_served
+        started = time.perf_counter()
+        stats = Counter()
+        try:
+            lines = reconcile_forwarder_zones(host, ptr_zones, args.target, token=args.token, stats=stats)
+        except RuntimeError as e:
+            lines = [f"FAILED: {e}"]
+            stats["failed"] += 1
+        return lines, stats, time.perf_counter() - started, pool.requests_served - calls_before
+
+    started = time.perf_counter()
+    totals = Counter()
+    calls = 0
+    for host, (lines, stats, elapsed, host_calls) in run_ordered(reconcile, hosts, len(hosts)):
+        print(f"\n{host} ({elapsed * 1000:.0f} ms, {host_calls} API calls):")
+        for line in lines:
+            print(f"  {line}")
+        totals.update(stats)
+        calls += host_calls
+        RESULTS.append("nodes", {"host": host, "results": lines, "ms": round(elapsed * 1000), "api_calls": host_calls})
+    RESULTS.set("changes", totals["changes"])
+    RESULTS.set("failed", totals["failed"])
+    print(f"\nDone in {(time.perf_counter() - started) * 1000:.0f} ms: {totals['changes']} change(s), "
+          f"{totals['failed']} failed, {calls} API call(s).")
+    if totals["failed"]:
+        sys.exit(1)
+
+
+def forwarder_zone_ops(host, zone, target, token=None):
+    """Operations that point an existing Forwarder zone at target (empty if it already does)."""
+    records = fetch_zone_records(host, zone, token=token)
+    if records is None:
+        raise RuntimeError(f"Failed to read records of {zone} on {host}")
+    current = [api_record_value(r) for r in records
+               if r.get('type') == "FWD" and r.get('name', '').rstrip(".").lower() == zone]
+    if target in current:
+        return []
+    base = {"zone": zone, "domain": zone, "type": "FWD"}
+    if current:
+        return [(f"~ zone {zone}: forwarder {current[0]} -> {target}", "/zones/records/update",
+                 {**base, "forwarder": current[0], "newForwarder": target})]
+    return [(f"+ zone {zone}: forwarder {target}", "/zones/records/add", {**base, "forwarder": target})]
+
+
+def plan_node(config, node, token=None):
+    """Read a node's settings and zones once and return the operations needed to converge it."""
+    resp = make_request(node, "/settings/get", token=token)
+    if not resp or resp.get('status') != 'ok':
+        raise RuntimeError(f"Failed to get settings from {node}")
+    current = resp.get('response', {})
+
+    ops = []
+    changes = cluster_config.settings_diff(config["settings"], current)
+    params = {key: cluster_config.encode_setting(want) for key, _, want in changes}
+    lines = [f"~ {key}: {have!r} -> {want!r}" for key, have, want in changes]
+    if config["tsig_keys"]:
+        merged, actions = cluster_config.tsig_diff(config["tsig_keys"], current.get('tsigKeys'))
+        if actions:
+            params["tsigKeys"] = merged
+            lines += [f"{'+' if action == 'add' else '~'} tsig key {name}" for action, name in actions]
+    if params:
+        ops.append(("\n".join(lines), "/settings/set", params))
+
+    wanted = cluster_config.zones_for_node(config, node)
+    existing = {}
+    if wanted:
+        existing = {z.get('name', '').rstrip(".").lower(): z for z in iter_zones(node, token=token)}
+    unchanged = 0
+    for zone in wanted:
+        have = existing.get(zone["name"])
+        if have is None:
+            params = {"zone": zone["name"], "type": zone["type"]}
+            if zone["forwarder"]:
+                params["forwarder"] = zone["forwarder"]
+            ops.append((f"+ zone {zone['name']} ({zone['type']})", "/zones/create", params))
+        elif have.get('type') != zone["type"]:
+            ops.append((f"! zone {zone['name']} is {have.get('type')}, wanted {zone['type']} (left unchanged)", None, None))
+        elif zone["type"] == "Forwarder":
+            fwd_ops = forwarder_zone_ops(node, zone["name"], zone["forwarder"], token=token)
+            ops.extend(fwd_ops)
+            unchanged += not fwd_ops
+        else:
+            unchanged += 1
+    return ops, unchanged
+
+
+def add_apply_arguments(parser):
+    parser.add_argument("-f", "--file", required=True, help="Desired-state TOML file")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without changing anything")
+
+
+def cmd_apply(args):
+    """Converge every node to the desired state in a cluster.toml file."""
+    try:
+        config = cluster_config.load(args.file, [args.primary, args.secondary])
+    except (OSError, cluster_config.ConfigError) as e:
+        print(f"Error: {e}")
+        RESULTS.set("error", str(e))
+        sys.exit(1)
+
+    def plan(node):
+        try:
+            return plan_node(config, node, token=args.token)
+        except RuntimeError as e:
+            return e
+
+    print(f"--- {'Plan' if args.dry_run else 'Applying'} {args.file} on {len(config['nodes'])} node(s) ---")
+    plans = list(run_ordered(plan, config["nodes"], len(config["nodes"])))
+    failed = pending = 0
+    for node, result in plans:
+        print(f"\n{node}:")
+        if isinstance(result, RuntimeError):
+            print(f"  FAILED: {result}")
+            RESULTS.append("plan", {"node": node, "error": str(result)})
+            failed += 1
+            continue
+        ops, unchanged = result
+        RESULTS.append("plan", {"node": node, "changes": [line for d, _, _ in ops for line in d.splitlines()],
+                                "unchanged_zones": unchanged})
+        for description, endpoint, _ in ops:
+            for line in description.splitlines():
+                print(f"  {line}")
+            pending += endpoint is not None
+        if unchanged:
+            print(f"  = {unchanged} zone(s) up to date")
+        if not ops:
+            print("  No changes.")
+
+    RESULTS.set("pending", pending)
+    if args.dry_run or not pending:
+        print(f"\n{pending} change(s) {'planned' if args.dry_run else 'needed'}.")
+        if failed:
+            sys.exit(1)
+        return
+
+    print()
+    for node, result in plans:
+        if isinstance(result, RuntimeError):
+            continue
+        for description, endpoint, params in result[0]:
+            if endpoint is None:
+                continue
+            resp = make_request(node, endpoint, params, token=args.token, method="POST")
+            label = description.splitlines()[0] if endpoint != "/settings/set" else f"settings ({len(params)} field(s))"
+            ok = bool(resp and resp.get('status') == 'ok')
+            if ok:
+                print(f"{node}: OK {label}")
+            else:
+                print(f"{node}: FAILED {label}: {resp.get('errorMessage') if resp else 'no response'}")
+                failed += 1
+            RESULTS.append("applied", {"node": node, "change": label, "ok": ok})
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,333 @@
+"""`import`: migrate Pi-hole Teleporter records into a zone."""
+
+import io
+import itertools
+import sys
+import time
+import zipfile
+from collections import Counter
+
+from api import (
+    DEFAULT_ZONE,
+    RDATA_FIELDS,
+    RESULTS,
+    RateLimiter,
+    UsageError,
+    api_record_value,
+    fetch_zone_records,
+    make_request,
+    percentile,
+    record_key,
+    run_ordered,
+)
+
+try:
+    import tomllib
+except ModuleNotFoundError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+def _lines(source):
+    """Accept either a whole text blob or an iterable of lines (e.g. an open file)."""
+    return source.splitlines() if isinstance(source, str) else source
+
+
+def parse_custom_list(source):
+    for raw in _lines(source):
+        line = raw.strip()
+        if not line or line.startswith("#"): continue
+        parts = line.split()
+        if len(parts) < 2: continue
+        ip, name = parts[0], parts[1]
+        if ":" in ip: continue
+        yield ("A", name, ip)
+
+
+def parse_custom_cname(source):
+    for raw in _lines(source):
+        line = raw.strip()
+        if not line or line.startswith("#"): continue
+        if line.startswith("cname="): line = line[len("cname="):]
+        if "," not in line: continue
+        alias, target = [part.strip() for part in line.split(",", 1)]
+        if not alias or not target: continue
+        yield ("CNAME", alias, target)
+
+
+def parse_pihole_toml(text):
+    records = []
+    if not tomllib: return records
+    try:
+        payload = tomllib.loads(text)
+    except Exception:
+        return records
+    dns = payload.get("dns", {})
+    for entry in dns.get("hosts", []) or []:
+        parts = str(entry).split()
+        if len(parts) < 2: continue
+        ip, name = parts[0], parts[1]
+        if ":" in ip: continue
+        records.append(("A", name, ip))
+    for entry in dns.get("cnameRecords", []) or []:
+        if "," not in str(entry): continue
+        alias, target = [part.strip() for part in str(entry).split(",", 1)]
+        if not alias or not target: continue
+        records.append(("CNAME", alias, target))
+    return records
+
+
+def iter_teleporter_records(path):
+    """Stream (type, name, value) records out of a Teleporter ZIP.
+
+    custom.list and custom-cname files are decoded line by line straight from
+    the archive; pihole.toml has to be parsed whole, but it only holds config.
+    """
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if name.endswith("custom.list"):
+                parser = parse_custom_list
+            elif "custom-cname" in name:
+                parser = parse_custom_cname
+            elif name.endswith("pihole.toml") and tomllib:
+                yield from parse_pihole_toml(zf.read(name).decode("utf-8", errors="replace"))
+                continue
+            else:
+                continue
+            with zf.open(name) as raw:
+                yield from parser(io.TextIOWrapper(raw, encoding="utf-8", errors="replace"))
+
+
+def normalize_name(name, zone):
+    name = name.rstrip(".")
+    zone = zone.rstrip(".")
+    if "." not in name: return f"{name}.{zone}"
+    return name
+
+
+# Record types managed by `import`; everything else in the zone is left alone.
+IMPORT_TYPES = ("A", "CNAME")
+
+
+def external_dns_owned_names(records, txt_prefix):
+    """Names owned by external-dns, derived from its TXT registry records."""
+    owned = set()
+    for record in records:
+        if record.get('type') != "TXT" or "heritage=external-dns" not in api_record_value(record):
+            continue
+        label, _, parent = record.get('name', '').lower().partition(".")
+        if not label.startswith(txt_prefix):
+            continue
+        label = label[len(txt_prefix):]
+        owned.add(f"{label}.{parent}")
+        # Newer registry format prefixes the record type, e.g. "externaldns-a-plex".
+        rtype, sep, rest = label.partition("-")
+        if sep and rtype.upper() in RDATA_FIELDS:
+            owned.add(f"{rest}.{parent}")
+    return owned
+
+
+def iter_record_changes(desired, current, prune=False, protected=(), stats=None):
+    """Yield the add/update/delete operations that turn `current` into `desired`.
+
+    `desired` is any iterable of (type, fqdn, value) and is consumed lazily, so
+    operations can be sent while the source is still being parsed; deletes
+    (with `prune`) follow once it is exhausted, and only if it yielded at
+    least one record. `current` is the raw record list from
+    /zones/records/get. Each op is (action, type, fqdn, value, old_value);
+    unchanged records are counted in `stats["unchanged"]`.
+    """
+    stats = stats if stats is not None else Counter()
+    current_index = {}
+    cnames = {}
+    for record in current:
+        rtype = record.get('type')
+        if rtype not in IMPORT_TYPES:
+            continue
+        name = record.get('name', '')
+        value = api_record_value(record)
+        key = record_key(name, rtype, value)
+        current_index[key] = (rtype, name, value)
+        if rtype == "CNAME" and key[0] not in protected:
+            cnames[key[0]] = key
+
+    seen = set()
+    replaced = set()
+    for rtype, fqdn, value in desired:
+        key = record_key(fqdn, rtype, value)
+        if key in seen:
+            continue
+        seen.add(key)
+        if key in current_index and key not in replaced:
+            stats["unchanged"] += 1
+            continue
+        # A name holds a single CNAME, so a changed target is always an update.
+        # A records are multi-valued: new values are added and, with --prune,
+        # the stale ones are deleted after the whole source has been read.
+        old_key = cnames.get(key[0]) if rtype == "CNAME" else None
+        if old_key and old_key not in seen and old_key not in replaced:
+            replaced.add(old_key)
+            yield ("update", rtype, fqdn, value, current_index[old_key][2])
+        else:
+            yield ("add", rtype, fqdn, value, None)
+
+    # An empty source must never read as "delete everything".
+    if prune and seen:
+        for key in sorted(current_index):
+            if key not in seen and key not in replaced and key[0] not in protected:
+                rtype, name, value = current_index[key]
+                yield ("delete", rtype, name, value, None)
+
+
+def record_op_request(op, zone, ttl=3600):
+    """Build the (endpoint, params) API call for a planned record operation."""
+    action, rtype, fqdn, value, old = op
+    field = RDATA_FIELDS[rtype]
+    params = {"zone": zone, "domain": fqdn, "type": rtype}
+    if action == "add":
+        params["ttl"] = ttl
+        params[field] = value
+    elif action == "update":
+        params["ttl"] = ttl
+        if rtype == "CNAME":
+            params["cname"] = value
+        else:
+            params[field] = old
+            params["new" + field[0].upper() + field[1:]] = value
+    else:
+        params[field] = value
+    return f"/zones/records/{action}", params
+
+
+def add_import_arguments(parser):
+    parser.add_argument("--zip", required=True, help="Path to zip file")
+    parser.add_argument("--zone", default=DEFAULT_ZONE, help="Target zone")
+    parser.add_argument("--dry-run", action="store_true", help="Don't apply changes")
+    parser.add_argument("--skip-existing", action="store_true", help="Skip existing records")
+    parser.add_argument("--force", action="store_true", help="Allow records outside zone")
+    parser.add_argument("--concurrency", type=int, default=1, help="Parallel API requests (default: 1)")
+    parser.add_argument("--diff", action="store_true", help="Fetch the zone once and only send changed records")
+    parser.add_argument("--prune", action="store_true", help="With --diff, delete A/CNAME records missing from the ZIP")
+    parser.add_argument("--txt-prefix", default="externaldns-", help="external-dns TXT registry prefix; owned names are never pruned")
+    parser.add_argument("--rate", type=float, default=0, help="Max requests/sec to the node (default: unlimited)")
+
+
+def cmd_import(args):
+    """Import Pi-hole Teleporter ZIP."""
+    if args.prune and not args.diff:
+        raise UsageError("--prune requires --diff")
+    if not args.zip or not zipfile.is_zipfile(args.zip):
+        print(f"Error: Invalid zip file: {args.zip}", file=sys.stderr)
+        RESULTS.set("error", f"invalid zip file: {args.zip}")
+        return
+
+    print(f"--- Importing from {args.zip} to {args.primary} (zone: {args.zone}) ---")
+    parsed = Counter()
+
+    def desired_records():
+        for rtype, name, value in iter_teleporter_records(args.zip):
+            parsed["records"] += 1
+            yield rtype, normalize_name(name, args.zone), value.rstrip(".")
+
+    # Peek before fetching or planning anything, so an empty ZIP sends nothing.
+    records = desired_records()
+    first = next(records, None)
+    if first is None:
+        print("No records found in zip.")
+        RESULTS.set("summary", {"parsed": 0})
+        return
+    records = itertools.chain([first], records)
+
+    stats = Counter()
+    if args.diff:
+        print("Fetching current zone records...")
+        current = fetch_zone_records(args.primary, args.zone, args.token)
+        if current is None:
+            print(f"Failed to fetch records for zone {args.zone}.")
+            RESULTS.set("error", f"failed to fetch records for zone {args.zone}")
+            return
+        protected = external_dns_owned_names(current, args.txt_prefix)
+        print(f"Zone has {len(current)} records.")
+        if args.prune and protected:
+            print(f"Protecting {len(protected)} external-dns owned name(s) from pruning.")
+        ops = iter_record_changes(records, current, prune=args.prune, protected=protected, stats=stats)
+    else:
+        ops = (("add", rtype, fqdn, value, None) for rtype, fqdn, value in records)
+    
+    counts = Counter()
+    
+    if args.dry_run:
+        for action, rtype, fqdn, value, old in ops:
+            detail = f"{old} -> {value}" if old else value
+            print(f"Dry Run: {action} {rtype} {fqdn} -> {detail}")
+            RESULTS.append("records", {"action": action, "type": rtype, "name": fqdn, "value": value,
+                                       "old": old, "result": "planned"})
+            counts[action] += 1
+        RESULTS.set("summary", {"parsed": parsed["records"], "unchanged": stats["unchanged"], **counts})
+        print(f"Done. Parsed: {parsed['records']}. Would add: {counts['add']}, update: {counts['update']}, "
+              f"delete: {counts['delete']}, unchanged: {stats['unchanged']}")
+        return
+
+    limiter = RateLimiter(args.rate)
+
+    def send(op):
+        endpoint, params = record_op_request(op, args.zone)
+        limiter.wait()
+        started = time.perf_counter()
+        resp = make_request(args.primary, endpoint, params, token=args.token)
+        return resp, time.perf_counter() - started
+
+    latencies = []
+    started = time.perf_counter()
+    labels = {"add": "Created", "update": "Updated", "delete": "Deleted"}
+
+    # Records are sent as they are parsed; results are reported in ZIP order
+    # even when --concurrency > 1.
+    for (action, rtype, fqdn, value, old), (resp, latency) in run_ordered(send, ops, args.concurrency):
+        latencies.append(latency)
+        if resp and resp.get('status') == 'ok':
+            detail = f"{old} -> {value}" if old else value
+            print(f"{labels[action]}: {rtype} {fqdn} -> {detail}")
+            result = labels[action].lower()
+            counts[action] += 1
+        elif action == "add" and resp and "already exists" in str(resp.get('errorMessage', '')).lower():
+            if args.skip_existing:
+                print(f"Exists: {rtype} {fqdn}")
+            else:
+                print(f"Error: {rtype} {fqdn} exists.")
+            result = "exists"
+            counts["skipped"] += 1
+        elif resp is None:
+            print(f"Failed: {action} {rtype} {fqdn} (no response from {args.primary})")
+            result = "failed"
+            counts["failed"] += 1
+        else:
+            print(f"Error: {action} {rtype} {fqdn} -> {resp}")
+            result = "error"
+            counts["skipped"] += 1
+        RESULTS.append("records", {"action": action, "type": rtype, "name": fqdn, "value": value,
+                                   "old": old, "result": result})
+
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    RESULTS.set("summary", {
+        "parsed": parsed["records"], "unchanged": stats["unchanged"], **counts,
+        "seconds": round(elapsed, 3),
+        "records_per_second": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    })
+    summary = f"Done. Parsed: {parsed['records']}, Created: {counts['add']}, Skipped: {counts['skipped']}"
+    if args.diff:
+        summary += f", Updated: {counts['update']}, Deleted: {counts['delete']}, Unchanged: {stats['unchanged']}"
+    if counts["failed"]:
+        summary += f", Failed: {counts['failed']}"
+    print(summary)
+    if latencies:
+        print(
+            f"Throughput: {len(latencies) / elapsed if elapsed else 0:.1f} records/s over {elapsed:.2f}s "
+            f"(concurrency {args.concurrency}), latency p50={percentile(latencies, 50) * 1000:.0f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.0f}ms"
+        )
@@ -0,0 +1,291 @@
+"""`analyze` and `aggregate`: query log reports from the Query Logs (Sqlite) app."""
+
+import math
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import log_aggregate
+import sketches
+from api import RESULTS, UsageError, make_request, print_rows, run_ordered
+from querylog_cache import DEFAULT_CACHE_PATH, QueryLogCache
+
+
+QUERY_LOGS_APP = {"name": "Query Logs (Sqlite)", "classPath": "QueryLogsSqlite.App"}
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# Entries this recent may still be buffered by the Query Logs app, so the cache
+# watermark trails the fetch end and that tail is fetched again on the next sync.
+SYNC_SETTLE_SECONDS = 60
+
+
+def iter_query_logs(host, start_time, end_time, token=None, rcode=None, window=4, records_per_page=1000, strict=False,
+                    stats=None):
+    """Stream query log entries from the Query Logs (Sqlite) app.
+
+    The first page reports totalPages; the rest are fetched concurrently, at
+    most `window` at a time, and yielded in page order so callers can
+    aggregate without holding the whole result set in memory. With `strict`,
+    a failed page raises RuntimeError; otherwise it is skipped with a warning
+    and counted in stats["skipped_pages"].
+    """
+    base = dict(QUERY_LOGS_APP)
+    base.update({
+        "start": start_time.strftime(LOG_TIME_FORMAT),
+        "end": end_time.strftime(LOG_TIME_FORMAT),
+        "recordsPerPage": records_per_page,
+    })
+    if rcode:
+        base["rcode"] = rcode
+
+    def fetch_page(page):
+        resp = make_request(host, "/logs/query", dict(base, pageNumber=page), token=token)
+        if not resp or resp.get('status') != 'ok':
+            if resp and resp.get('errorMessage'):
+                print(f"API Error: {resp.get('errorMessage')}")
+            if strict:
+                raise RuntimeError(f"Failed to fetch query log page {page} from {host}")
+            print(f"Warning: skipped query log page {page} from {host}; results are incomplete", file=sys.stderr)
+            if stats is not None:
+                stats["skipped_pages"] += 1
+            return None
+        return resp.get('response', {})
+
+    first = fetch_page(1)
+    if not first:
+        return
+    yield from first.get('entries', [])
+
+    total_pages = first.get('totalPages', 1)
+    for _, page in run_ordered(fetch_page, range(2, total_pages + 1), window):
+        if page:
+            yield from page.get('entries', [])
+
+
+def sync_query_logs(cache, host, start_time, end_time, token=None, window=4, retention_days=30):
+    """Fetch only the parts of [start_time, end_time) the local cache does not cover.
+
+    Returns the number of entries written. The cache is left untouched if any
+    page fails to download.
+    """
+    start = math.floor(start_time.timestamp())
+    end = math.ceil(end_time.timestamp())
+    utc = timezone.utc
+
+    try:
+        cutoff = min(start, end - retention_days * 86400)
+        cache.prune(host, cutoff)
+
+        cov = cache.coverage(host)
+        if cov and (start > cov[1] or end < cov[0]):
+            # Coverage must stay one contiguous window; start over.
+            cache.clear(host)
+            cov = None
+
+        if cov is None:
+            gaps = [(start, end)]
+        else:
+            gaps = [(lo, hi) for lo, hi in ((start, cov[0]), (cov[1], end)) if lo < hi]
+
+        written = 0
+        for lo, hi in gaps:
+            lo, hi = math.floor(lo), math.ceil(hi)
+            entries = iter_query_logs(host, datetime.fromtimestamp(lo, utc), datetime.fromtimestamp(hi, utc),
+                                      token=token, window=window, strict=True)
+            written += cache.store(host, lo, hi, entries)
+
+        low = min(start, cov[0]) if cov else start
+        high = max(end, cov[1]) if cov else end
+        cache.set_coverage(host, low, max(low, high - SYNC_SETTLE_SECONDS))
+        cache.commit()
+        return written
+    except Exception:
+        cache.rollback()
+        raise
+
+
+def open_log_stream(args, start_time, end_time, rcode=None, log=None, stats=None):
+    """Return (entries, cache) for a log window, read via the local cache when --cache is set.
+
+    Progress goes to `log` (default: the current sys.stdout, which --output
+    json redirects). Pages skipped on a live read are counted in `stats`; a
+    cache sync never skips. Returns None if the cache could not be synced.
+    """
+    log = log or sys.stdout
+    if not args.cache:
+        entries = iter_query_logs(args.primary, start_time, end_time, token=args.token, rcode=rcode, window=args.window,
+                                  stats=stats)
+        return entries, None
+
+    cache = QueryLogCache(args.cache)
+    try:
+        written = sync_query_logs(cache, args.primary, start_time, end_time, token=args.token,
+                                  window=args.window, retention_days=args.cache_retention_days)
+    except RuntimeError as e:
+        print(f"Cache sync failed: {e}", file=log)
+        cache.close()
+        return None
+    print(f"Cache: synced {written} new entries ({cache.count(args.primary)} cached in {args.cache})", file=log)
+    return cache.iter_entries(args.primary, start_time.timestamp(), end_time.timestamp(), rcode=rcode), cache
+
+
+def add_analyze_arguments(parser):
+    parser.add_argument("--hours", type=int, default=24, help="Analyze last N hours (default: 24)")
+    parser.add_argument("--limit", type=int, default=20, help="Show top N domains (default: 20)")
+    parser.add_argument("--mode", choices=("exact", "approx"), default="exact",
+                        help="exact counters, or bounded-memory sketches for long windows (default: exact)")
+    parser.add_argument("--sketch-size", type=int, default=1000,
+                        help="Heavy hitters tracked per key in approx mode (default: 1000)")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_PATH, default=None, metavar="PATH",
+                        help=f"Answer from a local SQLite cache, fetching only new entries (default path: {DEFAULT_CACHE_PATH})")
+    parser.add_argument("--cache-retention-days", type=int, default=30,
+                        help="Drop cached entries older than N days (default: 30)")
+    parser.add_argument("--window", type=int, default=4, help="Log pages fetched concurrently (default: 4)")
+
+
+def cmd_analyze(args):
+    """Analyze NXDOMAIN queries."""
+    # Calculate time range (UTC)
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(hours=args.hours)
+    fmt = LOG_TIME_FORMAT
+    
+    print(f"--- Analyzing NXDOMAIN queries on {args.primary} ---")
+    print(f"Timeframe: {start_time.strftime(fmt)} to {end_time.strftime(fmt)}")
+    
+    print("Fetching logs...")
+    domain_counts = sketches.make_counter(args.mode, args.sketch_size)
+    client_counts = sketches.make_counter(args.mode, args.sketch_size)
+    type_counts = Counter()
+    total_records = 0
+    stats = Counter()
+
+    stream = open_log_stream(args, start_time, end_time, rcode="NxDomain", stats=stats)
+    if stream is None:
+        return
+    entries, cache = stream
+
+    for log in entries:
+        total_records += 1
+        qname = log.get('qname')
+        client = log.get('clientIpAddress')
+        rtype = log.get('responseType')
+        
+        if qname:
+            domain_counts.add(qname)
+        if client:
+            client_counts.add(client)
+        if rtype:
+            type_counts[rtype] += 1
+
+    if cache:
+        cache.close()
+
+    print(f"Analyzed {total_records} NXDOMAIN records.")
+    if stats["skipped_pages"]:
+        print(f"Warning: {stats['skipped_pages']} log page(s) could not be fetched; counts are incomplete.")
+    RESULTS.set("summary", {"start": start_time.strftime(fmt), "end": end_time.strftime(fmt),
+                            "records": total_records, "skipped_pages": stats["skipped_pages"], "mode": args.mode,
+                            "distinct_domains": domain_counts.distinct() if total_records else 0,
+                            "distinct_clients": client_counts.distinct() if total_records else 0})
+
+    if not total_records:
+        print("No NXDOMAIN logs found in this period.")
+        return
+
+    approx = "~" if args.mode == "approx" else ""
+    print(f"Distinct domains: {approx}{domain_counts.distinct()}, distinct clients: {approx}{client_counts.distinct()}")
+
+    print(f"\n--- Response Type Breakdown ---")
+    for rtype, count in type_counts.items():
+        print(f"{rtype:<15}: {count}")
+
+    top_domains = domain_counts.most_common(args.limit)
+    top_clients = client_counts.most_common(args.limit)
+    RESULTS.set("response_types", dict(type_counts))
+    RESULTS.set("top_domains", [{"domain": d, "count": c} for d, c in top_domains])
+    RESULTS.set("top_clients", [{"client": ip, "count": c} for ip, c in top_clients])
+
+    print(f"\n--- Top {args.limit} Domains returning NXDOMAIN ---")
+    print(f"{'Count':<8} {'Domain'}")
+    print("-" * 40)
+    for domain, count in top_domains:
+        print(f"{count:<8} {domain}")
+
+    print(f"\n--- Top {args.limit} Clients requesting these domains ---")
+    print(f"{'Count':<8} {'Client IP'}")
+    print("-" * 40)
+    for client, count in top_clients:
+        print(f"{count:<8} {client}")
+
+
+def add_aggregate_arguments(parser):
+    parser.add_argument("--hours", type=int, default=24, help="Aggregate last N hours (default: 24)")
+    parser.add_argument("--group-by", default="rcode",
+                        help=f"Comma-separated fields: {', '.join(log_aggregate.DIMENSIONS)} (default: rcode)")
+    parser.add_argument("--rcode", help="Only these rcodes (comma-separated, e.g. NxDomain,ServerFailure)")
+    parser.add_argument("--qtype", help="Only these query types (comma-separated, e.g. A,AAAA)")
+    parser.add_argument("--client", help="Only clients inside this CIDR (e.g. 192.168.1.0/24)")
+    parser.add_argument("--domain", help="Only names at or under this domain")
+    parser.add_argument("--response-type", help="Only these response types (e.g. Blocked,Recursive)")
+    parser.add_argument("--subnet-prefix", type=int, default=24, help="IPv4 prefix for 'subnet' (default: 24)")
+    parser.add_argument("--subnet6-prefix", type=int, default=64, help="IPv6 prefix for 'subnet' (default: 64)")
+    parser.add_argument("--limit", type=int, default=50, help="Show top N groups, 0 for all (default: 50)")
+    parser.add_argument("--format", choices=("table", "json", "csv"), default="table", help="Output format")
+    parser.add_argument("--cache", nargs="?", const=DEFAULT_CACHE_PATH, default=None, metavar="PATH",
+                        help="Read through the local query-log cache (see analyze --cache)")
+    parser.add_argument("--cache-retention-days", type=int, default=30,
+                        help="Drop cached entries older than N days (default: 30)")
+    parser.add_argument("--window", type=int, default=4, help="Log pages fetched concurrently (default: 4)")
+
+
+def cmd_aggregate(args):
+    """Group query logs by arbitrary fields with filters."""
+    group_by = [dim.strip() for dim in args.group_by.split(",") if dim.strip()]
+    unknown = [dim for dim in group_by if dim not in log_aggregate.DIMENSIONS]
+    if not group_by or unknown:
+        raise UsageError(f"--group-by must list fields from: {', '.join(log_aggregate.DIMENSIONS)}")
+    try:
+        keep = log_aggregate.build_filter(rcode=args.rcode, qtype=args.qtype, client=args.client,
+                                          domain=args.domain, response_type=args.response_type)
+    except ValueError as e:
+        raise UsageError(f"--client: {e}") from None
+
+    end_time = datetime.now(timezone.utc)
+    start_time = end_time - timedelta(hours=args.hours)
+    # Progress goes to stderr so JSON/CSV on stdout stays machine-readable.
+    log = sys.stderr
+    print(f"--- Aggregating query logs on {args.primary} by {', '.join(group_by)} ---", file=log)
+    print(f"Timeframe: {start_time.strftime(LOG_TIME_FORMAT)} to {end_time.strftime(LOG_TIME_FORMAT)}", file=log)
+
+    # A single rcode can be filtered server-side (or in SQLite); lists are filtered locally.
+    pushdown = args.rcode if args.rcode and "," not in args.rcode else None
+    stats = Counter()
+    stream = open_log_stream(args, start_time, end_time, rcode=pushdown, log=log, stats=stats)
+    if stream is None:
+        return
+    entries, cache = stream
+
+    aggregator = log_aggregate.Aggregator(group_by, v4_prefix=args.subnet_prefix, v6_prefix=args.subnet6_prefix)
+    scanned = 0
+    started = time.perf_counter()
+    for entry in entries:
+        scanned += 1
+        if keep is None or keep(entry):
+            aggregator.add(entry)
+    rows = aggregator.rows(args.limit or None)
+    elapsed = time.perf_counter() - started
+    if cache:
+        cache.close()
+
+    print(f"Scanned {scanned} entries, {aggregator.total} matched, {len(aggregator.counts)} groups "
+          f"({elapsed:.2f}s).", file=log)
+    if stats["skipped_pages"]:
+        print(f"Warning: {stats['skipped_pages']} log page(s) could not be fetched; counts are incomplete.", file=log)
+    RESULTS.set("summary", {"scanned": scanned, "matched": aggregator.total, "groups": len(aggregator.counts),
+                            "skipped_pages": stats["skipped_pages"],
+                            "group_by": group_by, "seconds": round(elapsed, 3)})
+    RESULTS.set("rows", rows)
+    print_rows(rows, group_by + ["count", "avg_rtt_ms"], fmt=args.format)
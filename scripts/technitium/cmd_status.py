@@ -0,0 +1,74 @@
+"""`status`: one consolidated health table for every cluster node."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from api import RESULTS, discover_nodes, print_rows, timed_request, zone_list_page
+
+
+def add_status_arguments(parser):
+    parser.add_argument("--timeout", type=float, default=5, help="Per-call timeout in seconds (default: 5)")
+
+
+def cmd_status(args):
+    """Check status of every cluster node in parallel."""
+    print(f"--- Cluster Status (discovered via {args.primary}) ---")
+    nodes, primary_settings = discover_nodes(args.primary, args.secondary, token=args.token, timeout=args.timeout)
+
+    # Fan out every node's calls at once; a slow node only delays its own row.
+    calls = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(nodes) * 2)) as executor:
+        for node in nodes:
+            addr = node["address"]
+            if addr != args.primary:
+                calls[(addr, "settings")] = executor.submit(
+                    timed_request, addr, "/settings/get", token=args.token, timeout=args.timeout)
+            calls[(addr, "zones")] = executor.submit(
+                timed_request, addr, "/zones/list", {"pageNumber": 1, "recordsPerPage": 10},
+                token=args.token, timeout=args.timeout)
+        results = {key: future.result() for key, future in calls.items()}
+    results[(args.primary, "settings")] = primary_settings
+
+    rows = []
+    blocklists = {}
+    for node in nodes:
+        addr = node["address"]
+        settings, settings_s = results.get((addr, "settings"), (None, 0.0))
+        zones, zones_s = results[(addr, "zones")]
+        ok_settings = bool(settings and settings.get('status') == 'ok')
+        ok_zones = bool(zones and zones.get('status') == 'ok')
+
+        urls = None
+        if ok_settings:
+            urls = settings.get('response', {}).get('blockListUrls') or []
+            if isinstance(urls, str):
+                urls = [u.strip() for u in urls.split(',') if u.strip()]
+            blocklists[node["name"]] = urls
+
+        rows.append({
+            "node": node["name"],
+            "address": addr,
+            "state": node["state"],
+            "zones": zone_list_page(zones)[0] if ok_zones else "-",
+            "blocklists": len(urls) if urls is not None else "-",
+            "settings_ms": round(settings_s * 1000),
+            "zones_ms": round(zones_s * 1000),
+            "status": "ok" if ok_settings and ok_zones else "ERROR",
+        })
+
+    print_rows(rows, ["node", "address", "state", "zones", "blocklists", "settings_ms", "zones_ms", "status"])
+    RESULTS.set("nodes", [{k: None if v == "-" else v for k, v in row.items()} for row in rows])
+    RESULTS.set("blocklists", blocklists)
+
+    if blocklists:
+        reference_name, reference = next(iter(blocklists.items()))
+        print(f"\nBlocklists ({reference_name}): {len(reference)}")
+        for u in reference:
+            print(f"- {u}")
+        for name, urls in blocklists.items():
+            if set(urls) != set(reference):
+                print(f"WARNING: {name} blocklists differ from {reference_name}")
+
+    failed = [row["node"] for row in rows if row["status"] != "ok"]
+    RESULTS.set("failed", failed)
+    if failed:
+        print(f"\nUnreachable or failing nodes: {', '.join(failed)}")
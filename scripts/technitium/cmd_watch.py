@@ -0,0 +1,106 @@
+"""`watch`: poll node APIs and serve Prometheus metrics."""
+
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import metrics
+from api import RESULTS, UsageError, discover_nodes, run_ordered, timed_request
+
+
+# Read-only calls polled by `watch`, with the params each needs.
+WATCH_ENDPOINTS = {
+    "/settings/get": None,
+    "/zones/list": {"pageNumber": 1, "recordsPerPage": 1},
+}
+
+
+def serve_metrics(registry, listen):
+    """Serve registry.render() at /metrics on host:port from a daemon thread."""
+    host, _, port = listen.rpartition(":")
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_watch_arguments(parser):
+    parser.add_argument("--interval", type=float, default=15, help="Seconds between polls (default: 15)")
+    parser.add_argument("--timeout", type=float, default=5, help="Per-call timeout in seconds (default: 5)")
+    parser.add_argument("--listen", default="127.0.0.1:9798", help="Metrics address host:port (default: 127.0.0.1:9798)")
+    parser.add_argument("--endpoints", default=",".join(WATCH_ENDPOINTS),
+                        help=f"Comma-separated read-only endpoints to poll (default: {','.join(WATCH_ENDPOINTS)})")
+    parser.add_argument("--once", action="store_true", help="Poll once, print metrics to stdout and exit")
+
+
+def cmd_watch(args):
+    """Poll every node's API and expose latency/error metrics for Prometheus."""
+    if args.output == "json" and not args.once:
+        raise UsageError("--output json requires --once")
+    nodes, _ = discover_nodes(args.primary, args.secondary, token=args.token, timeout=args.timeout)
+    endpoints = {e: WATCH_ENDPOINTS.get(e) for e in args.endpoints.split(",") if e}
+
+    registry = metrics.Registry()
+    latency = metrics.Histogram("technitium_api_request_duration_seconds",
+                                "Technitium API response time.", registry)
+    requests = metrics.CounterMetric("technitium_api_requests_total",
+                                     "Technitium API calls by result.", registry)
+    up = metrics.Gauge("technitium_node_up", "1 if every polled endpoint succeeded on the last poll.", registry)
+    last_poll = metrics.Gauge("technitium_watch_last_poll_timestamp_seconds",
+                              "Unix time of the last completed poll.", registry)
+
+    def probe(target):
+        node, endpoint = target
+        return timed_request(node["address"], endpoint, endpoints[endpoint], token=args.token, timeout=args.timeout)
+
+    targets = [(node, endpoint) for node in nodes for endpoint in endpoints]
+    if not args.once:
+        serve_metrics(registry, args.listen)
+        print(f"--- Watching {len(nodes)} node(s) every {args.interval}s; metrics at http://{args.listen}/metrics ---")
+
+    cycle = 0
+    try:
+        while True:
+            cycle += 1
+            started = time.monotonic()
+            failed_nodes = set()
+            slowest = 0.0
+            calls = []
+            for (node, endpoint), (resp, seconds) in run_ordered(probe, targets, len(targets)):
+                labels = {"node": node["name"], "endpoint": endpoint}
+                ok = bool(resp and resp.get('status') == 'ok')
+                latency.observe(seconds, labels)
+                requests.inc(dict(labels, result="ok" if ok else "error"))
+                slowest = max(slowest, seconds)
+                calls.append({"node": node["name"], "endpoint": endpoint, "ok": ok, "ms": round(seconds * 1000, 2)})
+                if not ok:
+                    failed_nodes.add(node["name"])
+            for node in nodes:
+                up.set(0 if node["name"] in failed_nodes else 1, {"node": node["name"]})
+            last_poll.set(time.time())
+            RESULTS.set("calls", calls)
+            RESULTS.set("up", {node["name"]: node["name"] not in failed_nodes for node in nodes})
+
+            if args.once:
+                sys.stdout.write(registry.render())
+                return
+            print(f"poll #{cycle}: {len(targets)} calls, {len(failed_nodes)} node(s) failing, slowest {slowest * 1000:.0f}ms")
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        print("\nStopped.")
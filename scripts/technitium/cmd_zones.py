@@ -0,0 +1,267 @@
+"""`inventory` and `verify`: whole-cluster zone snapshots and consistency checks."""
+
+import hashlib
+import json
+import os
+import sys
+import time
+
+from api import RESULTS, api_record_value, discover_nodes, fetch_zone_records, iter_zones, run_ordered
+
+
+def snapshot_record(zone, record):
+    """Compact, diff-friendly representation of an API record."""
+    return {
+        "zone": zone,
+        "name": record.get('name', ''),
+        "type": record.get('type', ''),
+        "ttl": record.get('ttl'),
+        "value": api_record_value(record),
+        "disabled": bool(record.get('disabled', False)),
+    }
+
+
+def absolute_name(name):
+    return name if name.endswith(".") else f"{name}."
+
+
+def quote_txt(text):
+    """TXT data as quoted <character-string>s of at most 255 characters each."""
+    chunks = [text[i:i + 255] for i in range(0, len(text), 255)] or [""]
+    return " ".join('"' + c.replace("\\", "\\\\").replace('"', '\\"') + '"' for c in chunks)
+
+
+def mailbox_name(mailbox):
+    """SOA RNAME: hostmaster@example.com -> hostmaster.example.com. (dots in the local part escaped)."""
+    local, at, domain = mailbox.partition("@")
+    return absolute_name(f"{local.replace('.', chr(92) + '.')}.{domain}" if at else mailbox)
+
+
+# Types whose RDATA is a single domain name.
+NAME_TYPES = {"CNAME": "cname", "NS": "nameServer", "PTR": "ptrName", "DNAME": "dname", "ANAME": "aname"}
+
+
+def zone_rdata(rtype, value):
+    """Master-file RDATA for a snapshot value, or None for Technitium-only types (FWD, APP)."""
+    if rtype in ("A", "AAAA"):
+        return value
+    if rtype == "TXT":
+        return quote_txt(value)
+    rdata = json.loads(value) if value.startswith("{") else {NAME_TYPES.get(rtype, "value"): value}
+    if rtype in NAME_TYPES:
+        return absolute_name(rdata[NAME_TYPES[rtype]])
+    if rtype == "MX":
+        return f"{rdata['preference']} {absolute_name(rdata['exchange'])}"
+    if rtype == "SRV":
+        return f"{rdata['priority']} {rdata['weight']} {rdata['port']} {absolute_name(rdata['target'])}"
+    if rtype == "SOA":
+        return (f"{absolute_name(rdata['primaryNameServer'])} {mailbox_name(rdata['responsiblePerson'])} "
+                f"{rdata['serial']} {rdata['refresh']} {rdata['retry']} {rdata['expire']} {rdata['minimum']}")
+    if rtype == "CAA":
+        return f"{rdata['flags']} {rdata['tag']} {quote_txt(rdata['value'])}"
+    return None
+
+
+def format_zone_line(rec):
+    """One master-file line; disabled records and types with no standard form are commented out."""
+    try:
+        rdata = zone_rdata(rec["type"], rec["value"])
+    except (KeyError, ValueError):
+        rdata = None
+    line = f"{absolute_name(rec['name'])}\t{rec['ttl']}\tIN\t{rec['type']}\t{rdata or rec['value']}"
+    return f"; {line}" if rec["disabled"] or rdata is None else line
+
+
+def add_inventory_arguments(parser):
+    parser.add_argument("--node", help="Node to snapshot (default: --primary)")
+    parser.add_argument("--out", help="Output path (default: inventory-<node>.jsonl|.zone)")
+    parser.add_argument("--format", choices=("jsonl", "zone"), default="jsonl",
+                        help="jsonl, or an RFC 1035 zone file per zone (default: jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel zone fetches (default: 4)")
+    parser.add_argument("--include-internal", action="store_true", help="Include built-in internal zones")
+
+
+def cmd_inventory(args):
+    """Write a snapshot of every zone and record on a node."""
+    host = args.node or args.primary
+    out_path = args.out or f"inventory-{host}.{'zone' if args.format == 'zone' else 'jsonl'}"
+    print(f"--- Inventory of {host} -> {out_path} ---")
+
+    def fetch(zone):
+        return fetch_zone_records(host, zone['name'], args.token)
+
+    zones = (z for z in iter_zones(host, token=args.token, window=args.concurrency)
+             if args.include_internal or not z.get('internal'))
+
+    zone_count = record_count = failed = 0
+    started = time.perf_counter()
+    tmp_path = f"{out_path}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as out:
+            # Zones are fetched concurrently but written in list order, one at a time.
+            for zone, records in run_ordered(fetch, zones, args.concurrency):
+                zone_count += 1
+                if records is None:
+                    failed += 1
+                    print(f"Failed to fetch records for {zone['name']}", file=sys.stderr)
+                    continue
+                rows = sorted((snapshot_record(zone['name'], r) for r in records),
+                              key=lambda r: (r["name"].lower(), r["type"], r["value"]))
+                if args.format == "zone":
+                    out.write(f"$ORIGIN {zone['name']}.\n")
+                    out.writelines(format_zone_line(r) + "\n" for r in rows)
+                else:
+                    out.writelines(json.dumps(r, sort_keys=True) + "\n" for r in rows)
+                record_count += len(rows)
+    except RuntimeError as e:
+        os.remove(tmp_path)
+        print(f"Error: {e}")
+        RESULTS.set("error", str(e))
+        return
+    os.replace(tmp_path, out_path)
+
+    elapsed = time.perf_counter() - started
+    RESULTS.set("inventory", {"node": host, "path": out_path, "format": args.format, "zones": zone_count,
+                              "records": record_count, "failed_zones": failed, "seconds": round(elapsed, 3)})
+    print(f"Wrote {record_count} records from {zone_count} zones in {elapsed:.2f}s"
+          + (f" ({failed} zone(s) failed)" if failed else ""))
+
+
+def zone_tree(records):
+    """Build a two-level Merkle tree for a zone's records.
+
+    Returns (zone_hash, names) where names maps each owner name to
+    (name_hash, {record_hash: "TYPE TTL VALUE"}). Equal zone hashes mean
+    identical record sets; otherwise only names whose hash differs need to
+    be compared.
+    """
+    by_name = {}
+    for record in records:
+        rec = snapshot_record("", record)
+        display = f"{rec['type']} {rec['ttl']} {rec['value']}" + (" (disabled)" if rec['disabled'] else "")
+        digest = hashlib.sha256(f"{rec['name'].lower()}|{display}".encode("utf-8")).hexdigest()
+        by_name.setdefault(rec['name'].lower(), {})[digest] = display
+
+    names = {}
+    zone_hash = hashlib.sha256()
+    for name in sorted(by_name):
+        name_hash = hashlib.sha256("".join(sorted(by_name[name])).encode("ascii")).hexdigest()
+        names[name] = (name_hash, by_name[name])
+        zone_hash.update(f"{name}:{name_hash};".encode("utf-8"))
+    return zone_hash.hexdigest(), names
+
+
+def diff_zone_trees(reference, other):
+    """Yield (name, only_in_reference, only_in_other) for every differing name."""
+    ref_names, other_names = reference[1], other[1]
+    for name in sorted(set(ref_names) | set(other_names)):
+        ref_hash, ref_records = ref_names.get(name, (None, {}))
+        other_hash, other_records = other_names.get(name, (None, {}))
+        if ref_hash == other_hash:
+            continue
+        yield (name,
+               sorted(ref_records[h] for h in set(ref_records) - set(other_records)),
+               sorted(other_records[h] for h in set(other_records) - set(ref_records)))
+
+
+def add_verify_arguments(parser):
+    parser.add_argument("--deep", action="store_true", help="Hash every zone, even when SOA serials match")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel record fetches (default: 8)")
+
+
+def cmd_verify(args):
+    """Check that every node serves the same zones and records as the primary."""
+    nodes, _ = discover_nodes(args.primary, args.secondary, token=args.token)
+    reference = next((n for n in nodes if n["address"] == args.primary), nodes[0])
+    others = [n for n in nodes if n is not reference]
+    print(f"--- Verifying {len(others)} node(s) against {reference['name']} ({reference['address']}) ---")
+    started = time.perf_counter()
+
+    def list_zones(node):
+        try:
+            return {z['name'].lower(): z for z in iter_zones(node["address"], token=args.token, window=args.concurrency)
+                    if not z.get('internal')}
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            RESULTS.append("errors", str(e))
+            return None
+
+    zone_lists = dict(zip((n["name"] for n in nodes), (z for _, z in run_ordered(list_zones, nodes, len(nodes)))))
+    unreachable = [name for name, zones in zone_lists.items() if zones is None]
+    if unreachable:
+        # Exit 2, not 0: a node that cannot be checked is not consistent.
+        print(f"Could not list zones on: {', '.join(unreachable)}")
+        RESULTS.set("unreachable", unreachable)
+        sys.exit(2)
+
+    drift = 0
+    ref_zones = zone_lists[reference["name"]]
+    for node in others:
+        node_zones = zone_lists[node["name"]]
+        for zone in sorted(set(ref_zones) - set(node_zones)):
+            print(f"MISSING  {zone} on {node['name']}")
+            RESULTS.append("differences", {"kind": "missing", "zone": zone, "node": node["name"]})
+            drift += 1
+        for zone in sorted(set(node_zones) - set(ref_zones)):
+            print(f"EXTRA    {zone} on {node['name']}")
+            RESULTS.append("differences", {"kind": "extra", "zone": zone, "node": node["name"]})
+            drift += 1
+
+    # A matching SOA serial on every node means the zone is unchanged since the
+    # last transfer; only zones without one (or with --deep) need their records.
+    common = sorted(set.intersection(*(set(z) for z in zone_lists.values())))
+    to_hash = []
+    for zone in common:
+        serials = {zone_lists[n["name"]][zone].get('soaSerial') for n in nodes}
+        if args.deep or None in serials or len(serials) > 1:
+            to_hash.append(zone)
+    print(f"Zones: {len(common)} common, {len(common) - len(to_hash)} matched by SOA serial, {len(to_hash)} to hash")
+
+    def fetch(target):
+        zone, node = target
+        records = fetch_zone_records(node["address"], zone, args.token)
+        return None if records is None else zone_tree(records)
+
+    targets = [(zone, node) for zone in to_hash for node in nodes]
+    trees = {}
+    records_hashed = 0
+    for (zone, node), tree in run_ordered(fetch, targets, args.concurrency):
+        trees[node["name"]] = tree
+        if len(trees) < len(nodes):
+            continue
+        # All copies of this zone are in; compare, report, and drop them.
+        ref_tree = trees[reference["name"]]
+        if ref_tree is None:
+            print(f"ERROR    {zone}: could not fetch from {reference['name']}")
+            RESULTS.append("differences", {"kind": "error", "zone": zone, "node": reference["name"]})
+            drift += 1
+        else:
+            records_hashed += sum(len(recs) for _, recs in ref_tree[1].values())
+            for other in others:
+                tree = trees[other["name"]]
+                if tree is None:
+                    print(f"ERROR    {zone}: could not fetch from {other['name']}")
+                    RESULTS.append("differences", {"kind": "error", "zone": zone, "node": other["name"]})
+                    drift += 1
+                    continue
+                if tree[0] == ref_tree[0]:
+                    continue
+                for name, only_ref, only_other in diff_zone_trees(ref_tree, tree):
+                    drift += 1
+                    print(f"DIFF     {zone} {name} on {other['name']}")
+                    RESULTS.append("differences", {"kind": "diff", "zone": zone, "node": other["name"], "name": name,
+                                                   "only_on_reference": only_ref, "only_on_node": only_other})
+                    for rec in only_ref:
+                        print(f"  - {rec}  (only on {reference['name']})")
+                    for rec in only_other:
+                        print(f"  + {rec}  (only on {other['name']})")
+        trees = {}
+
+    elapsed = time.perf_counter() - started
+    RESULTS.set("summary", {"reference": reference["name"], "common_zones": len(common),
+                            "zones_hashed": len(to_hash), "records_hashed": records_hashed,
+                            "differences": drift, "seconds": round(elapsed, 3)})
+    print(f"Hashed {records_hashed} records per node in {elapsed:.2f}s. "
+          + ("All nodes consistent." if not drift else f"{drift} difference(s) found."))
+    if drift:
+        sys.exit(1)
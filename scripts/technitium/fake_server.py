@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Fake Technitium DNS API
+
+A local stand-in for the parts of the Technitium HTTP API that manage.py uses,
+for benchmarks and offline experiments. State lives in memory; query logs are
+generated deterministically per page, so any log size costs no memory.
+
+Usage:
+  python3 fake_server.py [--listen 127.0.0.1:5380] [--latency-ms N] [--log-entries N]
+
+Point manage.py at it with `--primary 127.0.0.1:5380 --token anything`.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LOG_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# rData field holding each record type's value, as in /zones/records/* calls.
+VALUE_FIELDS = {"A": "ipAddress", "AAAA": "ipAddress", "CNAME": "cname", "TXT": "text", "FWD": "forwarder"}
+
+
+class FakeTechnitium:
+    """In-memory zones, settings and synthetic query logs."""
+
+    def __init__(self, zones=10, records_per_zone=20, log_entries=10000, max_page_size=1000,
+                 latency_ms=0.0, seed=42):
+        self.zone_count = zones
+        self.records_per_zone = records_per_zone
+        self.log_entries = log_entries
+        self.max_page_size = max_page_size
+        self.latency = latency_ms / 1000.0
+        self.seed = seed
+        self.requests = Counter()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.settings = {
+                "version": "fake",
+                "clusterNodes": [],
+                "blockListUrls": ["https://example.invalid/hosts"],
+                "forwarders": ["9.9.9.9"],
+                "tsigKeys": [],
+            }
+            self.zones = {}
+            for i in range(self.zone_count):
+                name = f"zone{i}.internal"
+                self.zones[name] = {"type": "Primary", "records": [
+                    self._record(f"host{j}.{name}", "A", f"10.{i % 250}.{j // 250}.{j % 250}")
+                    for j in range(self.records_per_zone)
+                ]}
+                self.zones[name]["records"].append({"name": name, "type": "SOA", "ttl": 900, "rData": {"serial": 1}})
+            self.requests.clear()
+
+    @staticmethod
+    def _record(name, rtype, value, ttl=3600):
+        return {"name": name, "type": rtype, "ttl": ttl, "rData": {VALUE_FIELDS.get(rtype, "value"): value},
+                "disabled": False}
+
+    def _zone_for(self, params):
+        zone = params.get("zone", "").rstrip(".").lower()
+        if zone in self.zones:
+            return zone, self.zones[zone]
+        name = params.get("domain", "").rstrip(".").lower()
+        while name:
+            if name in self.zones:
+                return name, self.zones[name]
+            name = name.partition(".")[2]
+        raise LookupError(f"No such zone was found: {zone or params.get('domain')}")
+
+    # --- Endpoints: each returns the "response" payload or raises ---
+
+    def settings_get(self, params):
+        return json.loads(json.dumps(self.settings))
+
+    def settings_set(self, params):
+        for key, value in params.items():
+            if key == "tsigKeys":
+                value = json.loads(value)
+            elif key in ("forwarders", "blockListUrls"):
+                value = [v for v in value.split(",") if v]
+            self.settings[key] = value
+        return {}
+
+    def zones_list(self, params):
+        per_page = min(int(params.get("recordsPerPage", 10)), self.max_page_size)
+        page = int(params.get("pageNumber", 1))
+        names = sorted(self.zones)
+        zones = [{"name": n, "type": self.zones[n]["type"], "internal": False, "disabled": False,
+                  "soaSerial": 1} for n in names[(page - 1) * per_page:page * per_page]]
+        return {"pageNumber": page, "totalPages": max(1, -(-len(names) // per_page)),
+                "totalZones": len(names), "zones": zones}
+
+    def zones_create(self, params):
+        zone = params["zone"].rstrip(".").lower()
+        if zone in self.zones:
+            raise ValueError("Zone already exists.")
+        self.zones[zone] = {"type": params.get("type", "Primary"), "records": []}
+        if params.get("forwarder"):
+            self.zones[zone]["records"].append(self._record(zone, "FWD", params["forwarder"], ttl=0))
+        return {"domain": zone}
+
+    def zones_delete(self, params):
+        if self.zones.pop(params["zone"].rstrip(".").lower(), None) is None:
+            raise LookupError("No such zone was found.")
+        return {}
+
+    def records_get(self, params):
+        zone, data = self._zone_for(params)
+        if params.get("listZone") == "true":
+            records = data["records"]
+        else:
+            domain = params.get("domain", zone).rstrip(".").lower()
+            records = [r for r in data["records"] if r["name"] == domain]
+        return {"zone": {"name": zone, "type": data["type"]}, "records": records}
+
+    def records_add(self, params):
+        _, data = self._zone_for(params)
+        rtype = params["type"]
+        record = self._record(params["domain"].rstrip(".").lower(), rtype,
+                              params.get(VALUE_FIELDS.get(rtype, "value"), ""), int(params.get("ttl", 3600)))
+        if record not in data["records"]:
+            data["records"].append(record)
+        return {"addedRecord": record}
+
+    def _find(self, records, params, field):
+        name = params["domain"].rstrip(".").lower()
+        for record in records:
+            if record["name"] == name and record["type"] == params["type"] and \
+                    record["rData"].get(field) == params.get(field):
+                return record
+        raise LookupError("Record does not exist.")
+
+    def records_update(self, params):
+        _, data = self._zone_for(params)
+        field = VALUE_FIELDS.get(params["type"], "value")
+        record = self._find(data["records"], params, field)
+        new_field = "new" + field[0].upper() + field[1:]
+        record["rData"][field] = params.get(new_field, params.get(field))
+        return {"updatedRecord": record}
+
+    def records_delete(self, params):
+        _, data = self._zone_for(params)
+        data["records"].remove(self._find(data["records"], params, VALUE_FIELDS.get(params["type"], "value")))
+        return {}
+
+    def zone_options_set(self, params):
+        self._zone_for(params)
+        return {}
+
+    def logs_query(self, params):
+        """Page through log_entries synthetic entries spread evenly over [start, end)."""
+        per_page = min(int(params.get("recordsPerPage", 25)), self.max_page_size)
+        page = int(params.get("pageNumber", 1))
+        start = datetime.strptime(params["start"], LOG_TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+        end = datetime.strptime(params["end"], LOG_TIME_FORMAT).replace(tzinfo=timezone.utc).timestamp()
+        rcode = params.get("rcode")
+        step = (end - start) / max(1, self.log_entries)
+        rnd = random.Random(self.seed * 1_000_003 + page)
+        entries = []
+        for row in range((page - 1) * per_page, min(self.log_entries, page * per_page)):
+            stamp = datetime.fromtimestamp(start + row * step, timezone.utc)
+            popular = rnd.random() < 0.7
+            entries.append({
+                "rowNumber": row + 1,
+                "timestamp": stamp.strftime("%Y-%m-%dT%H:%M:%S.") + f"{stamp.microsecond // 1000:03d}Z",
+                "clientIpAddress": f"10.0.{rnd.randint(0, 3)}.{rnd.randint(1, 254)}",
+                "protocol": "Udp",
+                "responseType": rnd.choice(("Recursive", "Cached", "Blocked")),
+                "responseRtt": round(rnd.uniform(0.5, 40.0), 2),
+                "rcode": rcode or rnd.choice(("NoError", "NoError", "NxDomain", "ServerFailure")),
+                "qname": f"svc{int(rnd.paretovariate(1.2)) % 5000}.example.com" if popular
+                else f"{rnd.getrandbits(40):010x}.cdn.example.net",
+                "qtype": rnd.choice(("A", "AAAA", "HTTPS")),
+                "qclass": "IN",
+                "answer": "",
+            })
+        return {"pageNumber": page, "totalPages": max(1, -(-self.log_entries // per_page)),
+                "totalEntries": self.log_entries, "entries": entries}
+
+    ROUTES = {
+        "/api/settings/get": "settings_get",
+        "/api/settings/set": "settings_set",
+        "/api/zones/list": "zones_list",
+        "/api/zones/create": "zones_create",
+        "/api/zones/delete": "zones_delete",
+        "/api/zones/records/get": "records_get",
+        "/api/zones/records/add": "records_add",
+        "/api/zones/records/update": "records_update",
+        "/api/zones/records/delete": "records_delete",
+        "/api/zones/options/set": "zone_options_set",
+        "/api/logs/query": "logs_query",
+    }
+
+    def handle(self, path, params):
+        """Return the JSON body for an API call, in Technitium's status/response envelope."""
+        handler = self.ROUTES.get(path)
+        if handler is None:
+            return 404, {"status": "error", "errorMessage": f"Unknown endpoint: {path}"}
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests[path[4:]] += 1
+        try:
+            if handler == "logs_query":
+                # Stateless and the most expensive to build, so pages are generated in parallel.
+                return 200, {"status": "ok", "response": self.logs_query(params)}
+            with self._lock:
+                return 200, {"status": "ok", "response": getattr(self, handler)(params)}
+        except (KeyError, LookupError, ValueError) as e:
+            return 200, {"status": "error", "errorMessage": str(e)}
+
+
+def make_server(state, listen="127.0.0.1:0"):
+    """Create (but do not start) an HTTP server for state; port 0 picks a free port."""
+    host, _, port = listen.rpartition(":")
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Buffer writes so headers and body leave in one segment; unbuffered
+        # writes trip Nagle + delayed ACK and add ~40ms to every call.
+        wbufsize = -1
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True))
+            params.pop("token", None)
+            status, payload = state.handle(url.path, params)
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        do_POST = do_GET
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_server(state, listen="127.0.0.1:0"):
+    """Serve state from a daemon thread; returns (server, "host:port")."""
+    server = make_server(state, listen)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Technitium DNS API")
+    parser.add_argument("--listen", default="127.0.0.1:5380", help="host:port to listen on (default: 127.0.0.1:5380)")
+    parser.add_argument("--zones", type=int, default=10, help="Seed zones (default: 10)")
+    parser.add_argument("--records-per-zone", type=int, default=20, help="Seed A records per zone (default: 20)")
+    parser.add_argument("--log-entries", type=int, default=10000, help="Query log entries per query window (default: 10000)")
+    parser.add_argument("--max-page-size", type=int, default=1000, help="Largest page the server returns (default: 1000)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added delay per request in ms (default: 0)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for query logs (default: 42)")
+    args = parser.parse_args()
+
+    state = FakeTechnitium(zones=args.zones, records_per_zone=args.records_per_zone, log_entries=args.log_entries,
+                           max_page_size=args.max_page_size, latency_ms=args.latency_ms, seed=args.seed)
+    server = make_server(state, args.listen)
+    print(f"Fake Technitium API on http://{args.listen} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\nRequests served: {dict(state.requests)}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
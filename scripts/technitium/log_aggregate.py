@@ -0,0 +1,137 @@
+"""
+Single-pass group-by aggregation over Technitium query log entries.
+
+Entries are the dicts returned by /logs/query (or the local cache). Each
+entry is filtered, mapped to a tuple of dimension values and counted, so
+memory grows with the number of groups rather than the number of entries.
+"""
+
+import ipaddress
+from collections import Counter
+from functools import lru_cache
+
+# Second-level labels that commonly sit under a ccTLD as a public suffix
+# (e.g. example.co.uk). A heuristic stand-in for the full Public Suffix List.
+SECOND_LEVEL_SUFFIXES = {"co", "com", "net", "org", "gov", "edu", "ac", "or", "ne", "go"}
+
+DIMENSIONS = ("rcode", "qtype", "qname", "domain", "client", "subnet", "hour", "protocol", "response_type")
+
+
+@lru_cache(maxsize=65536)
+def registrable_domain(qname):
+    """Approximate eTLD+1 of a query name (e.g. a.b.example.co.uk -> example.co.uk)."""
+    labels = qname.rstrip(".").lower().split(".")
+    if len(labels) <= 2:
+        return ".".join(labels)
+    if len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+@lru_cache(maxsize=65536)
+def client_subnet(ip, v4_prefix=24, v6_prefix=64):
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    prefix = v4_prefix if addr.version == 4 else v6_prefix
+    return str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+
+
+def hour_bucket(timestamp):
+    """Truncate an ISO timestamp to the hour (2026-01-14T09:42:11Z -> 2026-01-14T09:00Z)."""
+    return f"{timestamp[:13]}:00Z" if timestamp else ""
+
+
+# Dimension -> (source field in the log entry, derivation applied to its value).
+def _dimension_specs(v4_prefix=24, v6_prefix=64):
+    same = lambda value: value
+    return {
+        "rcode": ("rcode", same),
+        "qtype": ("qtype", same),
+        "qname": ("qname", str.lower),
+        "domain": ("qname", registrable_domain),
+        "client": ("clientIpAddress", same),
+        "subnet": ("clientIpAddress", lambda ip: client_subnet(ip, v4_prefix, v6_prefix)),
+        "hour": ("timestamp", hour_bucket),
+        "protocol": ("protocol", same),
+        "response_type": ("responseType", same),
+    }
+
+
+def build_key_func(group_by, v4_prefix=24, v6_prefix=64):
+    """Return a function mapping a log entry to its tuple of group-by values."""
+    specs = _dimension_specs(v4_prefix, v6_prefix)
+    funcs = [specs[dim] for dim in group_by]
+    return lambda entry: tuple(derive(entry.get(field) or "") for field, derive in funcs)
+
+
+def build_filter(rcode=None, qtype=None, client=None, domain=None, response_type=None):
+    """Return a predicate for log entries, or None when no filter is set.
+
+    Raises ValueError if client is not an IP address or CIDR.
+    """
+    checks = []
+    if rcode:
+        wanted_rcodes = {r.lower() for r in rcode.split(",")}
+        checks.append(lambda e: (e.get("rcode") or "").lower() in wanted_rcodes)
+    if qtype:
+        wanted_qtypes = {q.upper() for q in qtype.split(",")}
+        checks.append(lambda e: (e.get("qtype") or "").upper() in wanted_qtypes)
+    if response_type:
+        wanted_types = {t.lower() for t in response_type.split(",")}
+        checks.append(lambda e: (e.get("responseType") or "").lower() in wanted_types)
+    if client:
+        network = ipaddress.ip_network(client, strict=False)
+
+        @lru_cache(maxsize=65536)
+        def in_network(ip):
+            try:
+                return ipaddress.ip_address(ip) in network
+            except ValueError:
+                return False
+
+        checks.append(lambda e: in_network(e.get("clientIpAddress") or ""))
+    if domain:
+        suffix = domain.lower().strip(".")
+
+        def under_domain(e):
+            qname = (e.get("qname") or "").lower().rstrip(".")
+            return qname == suffix or qname.endswith("." + suffix)
+
+        checks.append(under_domain)
+    if not checks:
+        return None
+    return lambda e: all(check(e) for check in checks)
+
+
+class Aggregator:
+    """Count entries and mean response RTT per group in a single pass."""
+
+    def __init__(self, group_by, v4_prefix=24, v6_prefix=64):
+        self.group_by = list(group_by)
+        self.key_func = build_key_func(group_by, v4_prefix, v6_prefix)
+        self.counts = Counter()
+        self.rtt_sums = Counter()
+        self.rtt_counts = Counter()
+        self.total = 0
+
+    def add(self, entry):
+        self.total += 1
+        key = self.key_func(entry)
+        self.counts[key] += 1
+        rtt = entry.get("responseRtt")
+        if rtt is not None:
+            self.rtt_sums[key] += rtt
+            self.rtt_counts[key] += 1
+
+    def rows(self, limit=None):
+        """Return groups as dicts sorted by count, descending."""
+        out = []
+        for key, count in self.counts.most_common(limit):
+            row = dict(zip(self.group_by, key))
+            row["count"] = count
+            n = self.rtt_counts.get(key)
+            row["avg_rtt_ms"] = round(self.rtt_sums[key] / n, 2) if n else None
+            out.append(row)
+        return out
@@ -16,568 +16,163 @@ Features:
 Usage:
   python3 manage.py <command> [options]
 
-Commands:
-  status             Check cluster status
-  setup              Run initial setup (zones, settings)
-  reverse-dns        Configure reverse DNS zones
-  forwarders         Update upstream forwarders
-  import             Import Pi-hole records
-  analyze            Analyze NXDOMAIN queries
+Run `python3 manage.py --help` for every command. Each command lives in a
+cmd_*.py module that is only imported when that command runs.
 """
 
-import argparse
-import os
 import sys
-import json
-import urllib.request
-import urllib.parse
-import zipfile
-import shutil
-import subprocess
-import random
-import getpass
-from datetime import datetime, timedelta, timezone
-from collections import Counter
-
-try:
-    import tomllib
-except ModuleNotFoundError:
-    try:
-        import tomli as tomllib
-    except ImportError:
-        tomllib = None
-
-# Default Configuration
-DEFAULT_PRIMARY = "192.168.1.7"
-DEFAULT_SECONDARY = "192.168.1.8"
-DEFAULT_PORT = 5380
-DEFAULT_ZONE = "torquasmvo.internal"
-ENV_TOKEN = os.environ.get("TECHNITIUM_TOKEN")
-
-
-# --- Shared Utilities ---
-
-def make_request(host, endpoint, params=None, token=None, timeout=30, method="GET"):
-    """Make an API request to a Technitium instance."""
-    if not token:
-        token = ENV_TOKEN
-    
-    if not token:
-        print(f"Error: No API token provided for {host}{endpoint}. Set TECHNITIUM_TOKEN env var.", file=sys.stderr)
-        return None
-
-    base_url = f"http://{host}:{DEFAULT_PORT}/api"
-    url = f"{base_url}{endpoint}?token={token}"
-    
-    if params:
-        for k, v in params.items():
-            if isinstance(v, (dict, list)):
-                v = json.dumps(v)
-            url += f"&{k}={urllib.parse.quote(str(v))}"
-    
-    try:
-        req = urllib.request.Request(url, method=method)
-        with urllib.request.urlopen(req, timeout=timeout) as response:
-            return json.loads(response.read().decode('utf-8'))
-    except Exception as e:
-        print(f"Error accessing {host}{endpoint}: {e}", file=sys.stderr)
-        return None
-
-
-# --- Commands ---
-
-def cmd_external_dns(args):
-    """Configure External-DNS (TSIG Key + Zone Options)."""
-    print(f"--- Configuring External-DNS on Primary ({args.primary}) ---")
-
-    # 1. Get Current Settings (for TSIG Keys)
-    print("Fetching current settings...")
-    settings = make_request(args.primary, "/settings/get", token=args.token)
-    if not settings or settings.get('status') != 'ok':
-        print("Failed to get settings.")
-        return
-
-    current_config = settings.get('response', {})
-    current_keys = current_config.get('tsigKeys', [])
-    
-    # 2. Add TSIG Key
-    key_name = "external-dns-key"
-    exists = False
-    for k in current_keys:
-        if k['keyName'] == key_name:
-            exists = True
-            print(f"TSIG Key '{key_name}' already exists.")
-            break
-    
-    if not exists:
-        if not args.secret:
-            print(f"Error: TSIG Key '{key_name}' missing and no --secret provided.")
-            return
-
-        print(f"Adding '{key_name}'...")
-        new_key = {
-            "keyName": key_name,
-            "sharedSecret": args.secret,
-            "algorithmName": "hmac-sha256"
-        }
-        current_keys.append(new_key)
-        
-        # Update Settings
-        # Note: We must send the FULL list of keys to avoid overwriting existing ones.
-        # /settings/set accepts 'tsigKeys' as a JSON string.
-        resp = make_request(args.primary, "/settings/set", {"tsigKeys": current_keys}, token=args.token, method="POST")
-        if resp and resp.get('status') == 'ok':
-            print("TSIG Key added successfully.")
-        else:
-            print(f"Failed to add TSIG Key: {resp}")
-            return
-
-    # 3. Configure Zone Options
-    print(f"Configuring Zone '{args.zone}' options...")
-    
-    policy = f"{key_name}|*.{args.zone}|A,AAAA,TXT"
-    params = {
-        "zone": args.zone,
-        "update": "Allow",
-        "updateSecurityPolicies": policy,
-        "zoneTransfer": "Allow",
-        "zoneTransferTsigKeyNames": key_name
-    }
-    
-    # Use zones/options/set (verified working endpoint)
-    resp = make_request(args.primary, "/zones/options/set", params, token=args.token, method="POST")
-    
-    if resp and resp.get('status') == 'ok':
-        print("Zone options configured successfully (Update: Allow, Transfer: Allow).")
-    else:
-        print(f"Failed to configure zone options: {resp}")
-
-
-def cmd_status(args):
-    """Check status of the cluster."""
-    print(f"--- Checking Primary ({args.primary}) ---")
-    
-    # Check Clustering
-    resp = make_request(args.primary, "/settings/get", token=args.token)
-    if resp and resp.get('status') == 'ok':
-        nodes = resp.get('response', {}).get('clusterNodes', [])
-        print(f"Cluster Nodes: {len(nodes)}")
-        for node in nodes:
-            print(f"- {node['name']} ({node['ipAddresses'][0]}): {node['state']}")
-    else:
-        print("Failed to get Primary settings.")
-
-    print(f"\n--- Checking Secondary ({args.secondary}) ---")
-    
-    # Check Zones
-    resp = make_request(args.secondary, "/zones/list", {"pageNumber": 1, "recordsPerPage": 10}, token=args.token)
-    if resp and resp.get('status') == 'ok':
-        total = resp.get('response', {}).get('totalRecords', 0)
-        print(f"Zones: {total}")
-        for zone in resp.get('response', {}).get('data', []):
-            print(f"- {zone['name']} ({zone['type']})")
-    else:
-        print("Failed to get Secondary zones.")
-
-    # Check Blocklists
-    resp = make_request(args.secondary, "/settings/get", token=args.token)
-    if resp and resp.get('status') == 'ok':
-        urls = resp.get('response', {}).get('blockListUrls', [])
-        print(f"Blocklists: {len(urls)}")
-        for u in urls:
-            print(f"- {u}")
-    else:
-        print("Failed to get Secondary settings.")
-
-
-def cmd_setup(args):
-    """Run initial setup on Primary."""
-    print(f"--- Setting up Primary ({args.primary}) ---")
-
-    # 1. Get Current Settings
-    print("Fetching current settings...")
-    settings = make_request(args.primary, "/settings/get", token=args.token)
-    if not settings or settings.get('status') != 'ok':
-        print("Failed to get settings.")
-        return
-
-    current_config = settings.get('response', {})
-    
-    # 2. Prepare Blocklists
-    new_blocklists = [
-        "https://raw.githubusercontent.com/StevenBlack/hosts/master/hosts",
-        "https://big.oisd.nl/",
-        "https://adaway.org/hosts.txt",
-        "https://v.firebog.net/hosts/AdguardDNS.txt"
-    ]
-    
-    existing_urls = current_config.get('blockListUrls', [])
-    if isinstance(existing_urls, str):
-        existing_urls = [u.strip() for u in existing_urls.split(',')]
-    
-    final_urls = list(existing_urls)
-    for url in new_blocklists:
-        if url not in final_urls:
-            final_urls.append(url)
-            
-    final_urls_str = ",".join(final_urls)
-
-    # 3. Apply Settings
-    update_params = {
-        "forwarders": "9.9.9.9,149.112.112.112", # Quad9 Default
-        "enableBlocking": "true",
-        "blockListUrls": final_urls_str,
-        "enableQNameMinimization": "true",
-        "enableDnsSec": "true"
-    }
-
-    print(f"Applying settings (Blocklists: {len(final_urls)})...")
-    resp = make_request(args.primary, "/settings/set", update_params, token=args.token)
-    if resp and resp.get('status') == 'ok':
-        print("Settings configured successfully.")
-    else:
-        print(f"Failed to apply settings: {resp}")
-
-    # 4. Create Zone
-    print(f"Ensuring zone exists: {args.zone}")
-    resp = make_request(args.primary, "/zones/create", {"zone": args.zone, "type": "Primary"}, token=args.token)
-    if resp and resp.get('status') == 'ok':
-        print("Zone created.")
-    elif resp and "Zone already exists" in resp.get('errorMessage', ''):
-        print("Zone already exists (OK).")
-    else:
-        print(f"Failed to create zone: {resp}")
-
-
-def cmd_create_zone(args):
-    """Create a new Primary zone."""
-    print(f"--- Creating Zone '{args.zone}' on Primary ({args.primary}) ---")
-    resp = make_request(args.primary, "/zones/create", {"zone": args.zone, "type": "Primary"}, token=args.token)
-    if resp and resp.get('status') == 'ok':
-        print(f"Zone '{args.zone}' created successfully.")
-    elif resp:
-        print(f"Failed to create zone: {resp.get('errorMessage')}")
-    else:
-        print("Failed to communicate with API.")
-
-
-def cmd_reverse_dns(args):
-    """Configure Reverse DNS (PTR) zones on ALL nodes."""
-    ptr_zones = ["1.168.192.in-addr.arpa", "0.0.10.in-addr.arpa"]
-    hosts = [args.primary, args.secondary]
-
-    for host in hosts:
-        print(f"\n--- Configuring {host} ---")
-        for zone in ptr_zones:
-            print(f"Ensuring zone: {zone}")
-            
-            # Create as Forwarder
-            resp = make_request(host, "/zones/create", {
-                "zone": zone, 
-                "type": "Forwarder",
-                "forwarder": args.target  # e.g., 192.168.1.1
-            }, token=args.token)
-            
-            if resp and resp.get('status') == 'ok':
-                print(f"  OK: Zone {zone} created.")
-            elif resp and "Zone already exists" in resp.get('errorMessage', ''):
-                print(f"  Exists: Resetting {zone}...")
-                make_request(host, "/zones/delete", {"zone": zone}, token=args.token)
-                make_request(host, "/zones/create", {
-                    "zone": zone, 
-                    "type": "Forwarder",
-                    "forwarder": args.target
-                }, token=args.token)
-                print(f"  OK: Zone {zone} reset.")
-            else:
-                print(f"  FAILED: {resp}")
-
 
-def cmd_forwarders(args):
-    """Update upstream forwarders."""
-    print(f"--- Updating Forwarders on Primary ({args.primary}) ---")
-    print(f"New Forwarders: {args.forwarders}")
+import startup_profile
 
-    resp = make_request(args.primary, "/settings/set", {"forwarders": args.forwarders}, token=args.token)
-    if resp and resp.get('status') == 'ok':
-        print("Forwarders updated successfully.")
-    else:
-        print(f"Failed to update forwarders: {resp}")
-
-
-def cmd_analyze(args):
-    """Analyze NXDOMAIN queries."""
-    # Calculate time range (UTC)
-    end_time = datetime.now(timezone.utc)
-    start_time = end_time - timedelta(hours=args.hours)
-    fmt = "%Y-%m-%d %H:%M:%S"
-    
-    print(f"--- Analyzing NXDOMAIN queries on {args.primary} ---")
-    print(f"Timeframe: {start_time.strftime(fmt)} to {end_time.strftime(fmt)}")
-    
-    all_logs = []
-    page = 1
-    records_per_page = 1000
-    
-    print("Fetching logs...")
-    while True:
-        params = {
-            "name": "Query Logs (Sqlite)",
-            "classPath": "QueryLogsSqlite.App",
-            "rcode": "NxDomain",
-            "start": start_time.strftime(fmt),
-            "end": end_time.strftime(fmt),
-            "recordsPerPage": records_per_page,
-            "pageNumber": page
-        }
-
-        resp = make_request(args.primary, "/logs/query", params, token=args.token)
-        if not resp or resp.get('status') != 'ok':
-            if resp and resp.get('errorMessage'):
-                 print(f"API Error: {resp.get('errorMessage')}")
-            break
-
-        entries = resp.get('response', {}).get('entries', [])
-        if not entries:
-            break
-            
-        all_logs.extend(entries)
-        
-        total_pages = resp.get('response', {}).get('totalPages', 1)
-        if page >= total_pages or len(all_logs) >= 20000: # Safety cap
-            break
-        page += 1
-
-    total_records = len(all_logs)
-    print(f"Analyzed {total_records} NXDOMAIN records.")
-
-    if not all_logs:
-        print("No NXDOMAIN logs found in this period.")
-        return
-
-    domain_counts = Counter()
-    client_counts = Counter()
-    type_counts = Counter()
-    
-    for log in all_logs:
-        qname = log.get('qname')
-        client = log.get('clientIpAddress')
-        rtype = log.get('responseType')
-        
-        if qname:
-            domain_counts[qname] += 1
-        if client:
-            client_counts[client] += 1
-        if rtype:
-            type_counts[rtype] += 1
-
-    print(f"\n--- Response Type Breakdown ---")
-    for rtype, count in type_counts.items():
-        print(f"{rtype:<15}: {count}")
-
-    print(f"\n--- Top {args.limit} Domains returning NXDOMAIN ---")
-    print(f"{'Count':<8} {'Domain'}")
-    print("-" * 40)
-    for domain, count in domain_counts.most_common(args.limit):
-        print(f"{count:<8} {domain}")
-
-    print(f"\n--- Top {args.limit} Clients requesting these domains ---")
-    print(f"{'Count':<8} {'Client IP'}")
-    print("-" * 40)
-    for client, count in client_counts.most_common(args.limit):
-        print(f"{count:<8} {client}")
-
-
-# --- Import Logic (Pi-hole) ---
-
-def parse_custom_list(text):
-    records = []
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"): continue
-        parts = line.split()
-        if len(parts) < 2: continue
-        ip, name = parts[0], parts[1]
-        if ":" in ip: continue
-        records.append(("A", name, ip))
-    return records
-
-def parse_custom_cname(text):
-    records = []
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"): continue
-        if line.startswith("cname="): line = line[len("cname="):]
-        if "," not in line: continue
-        alias, target = [part.strip() for part in line.split(",", 1)]
-        if not alias or not target: continue
-        records.append(("CNAME", alias, target))
-    return records
-
-def parse_pihole_toml(text):
-    records = []
-    if not tomllib: return records
-    try:
-        payload = tomllib.loads(text)
-    except Exception:
-        return records
-    dns = payload.get("dns", {})
-    for entry in dns.get("hosts", []) or []:
-        parts = str(entry).split()
-        if len(parts) < 2: continue
-        ip, name = parts[0], parts[1]
-        if ":" in ip: continue
-        records.append(("A", name, ip))
-    for entry in dns.get("cnameRecords", []) or []:
-        if "," not in str(entry): continue
-        alias, target = [part.strip() for part in str(entry).split(",", 1)]
-        if not alias or not target: continue
-        records.append(("CNAME", alias, target))
-    return records
-
-def normalize_name(name, zone):
-    name = name.rstrip(".")
-    zone = zone.rstrip(".")
-    if "." not in name: return f"{name}.{zone}"
-    return name
-
-def cmd_import(args):
-    """Import Pi-hole Teleporter ZIP."""
-    if not args.zip or not zipfile.is_zipfile(args.zip):
-        print(f"Error: Invalid zip file: {args.zip}", file=sys.stderr)
-        return
-
-    print(f"--- Importing from {args.zip} to {args.primary} ---")
-    records = []
-    
-    with zipfile.ZipFile(args.zip) as zf:
-        # Check files
-        for name in zf.namelist():
-            if name.endswith("custom.list"):
-                records.extend(parse_custom_list(zf.read(name).decode("utf-8", errors="replace")))
-            elif "custom-cname" in name:
-                records.extend(parse_custom_cname(zf.read(name).decode("utf-8", errors="replace")))
-            elif name.endswith("pihole.toml") and tomllib:
-                records.extend(parse_pihole_toml(zf.read(name).decode("utf-8", errors="replace")))
-
-    if not records:
-        print("No records found in zip.")
-        return
-
-    print(f"Found {len(records)} records. Importing to zone: {args.zone}...")
-    
-    created = 0
-    skipped = 0
-    
-    for rtype, name, value in records:
-        fqdn = normalize_name(name, args.zone)
-        # Check if inside zone (basic check)
-        if not fqdn.endswith(args.zone) and not args.force:
-             # Basic filter
-             pass
-
-        params = {
-            "zone": args.zone,
-            "domain": fqdn,
-            "type": rtype,
-            "ttl": 3600
-        }
-        
-        if rtype == "A": params["ipAddress"] = value
-        elif rtype == "CNAME": params["cname"] = value.rstrip(".")
-        
-        if args.dry_run:
-            print(f"Dry Run: {rtype} {fqdn} -> {value}")
-            created += 1
-            continue
-
-        resp = make_request(args.primary, "/zones/records/add", params, token=args.token)
-        
-        if resp and resp.get('status') == 'ok':
-            print(f"Created: {rtype} {fqdn} -> {value}")
-            created += 1
-        elif resp and "already exists" in str(resp.get('errorMessage', '')).lower():
-            if args.skip_existing:
-                print(f"Exists: {rtype} {fqdn}")
-            else:
-                print(f"Error: {rtype} {fqdn} exists.")
-            skipped += 1
-        else:
-            print(f"Error: {rtype} {fqdn} -> {resp}")
-            skipped += 1
-
-    print(f"Done. Created: {created}, Skipped: {skipped}")
+# Installed before anything else is imported so every module shows up.
+PROFILER = startup_profile.start() if "--profile-startup" in sys.argv[1:] else None
 
+import argparse
+import contextlib
+import importlib
+import json
+import time
+
+import api
+
+# Subcommand registry: name -> (module, help). The module is imported only when
+# its command runs (or `<command> --help` is requested) and must provide
+# add_<name>_arguments(parser) and cmd_<name>(args), with dashes as underscores.
+COMMANDS = {
+    "status": ("cmd_status", "Check cluster status"),
+    "watch": ("cmd_watch", "Poll nodes and serve Prometheus metrics"),
+    "inventory": ("cmd_zones", "Snapshot all zones and records to a file"),
+    "verify": ("cmd_zones", "Compare zones and records across all nodes"),
+    "blocklists": ("cmd_blocklists", "Blocklist tools"),
+    "apply": ("cmd_config", "Converge nodes to a declarative cluster.toml"),
+    "setup": ("cmd_config", "Run initial setup"),
+    "create-zone": ("cmd_config", "Create a new primary zone"),
+    "reverse-dns": ("cmd_config", "Configure Reverse DNS zones"),
+    "external-dns": ("cmd_config", "Configure External-DNS (TSIG + Zone)"),
+    "forwarders": ("cmd_config", "Update upstream forwarders"),
+    "import": ("cmd_import", "Import Pi-hole Teleporter"),
+    "analyze": ("cmd_logs", "Analyze NXDOMAIN queries"),
+    "aggregate": ("cmd_logs", "Group query logs by any field"),
+}
+
+
+def add_global_arguments(parser):
+    parser.add_argument("--token", default=api.ENV_TOKEN, help="API Token (default: env TECHNITIUM_TOKEN)")
+    parser.add_argument("--primary", default=api.DEFAULT_PRIMARY, help=f"Primary IP (default: {api.DEFAULT_PRIMARY})")
+    parser.add_argument("--secondary", default=api.DEFAULT_SECONDARY, help=f"Secondary IP (default: {api.DEFAULT_SECONDARY})")
+    parser.add_argument("--connection-stats", action="store_true", help="Print connection reuse stats on exit")
+    parser.add_argument("--cache-ttl", type=float, default=30,
+                        help="Seconds to reuse read-only API responses within this run; 0 disables (default: 30)")
+    parser.add_argument("--cache-stats", action="store_true", help="Print response cache hit/miss counts on exit")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="Retries for idempotent calls and failed connects (default: 2)")
+    parser.add_argument("--retry-backoff", type=float, default=0.5,
+                        help="Base seconds for jittered exponential backoff (default: 0.5)")
+    parser.add_argument("--breaker-threshold", type=int, default=5,
+                        help="Consecutive errors before failing fast on a host; 0 disables (default: 5)")
+    parser.add_argument("--breaker-cooldown", type=float, default=30,
+                        help="Seconds a tripped host is skipped before a trial call (default: 30)")
+    parser.add_argument("--connect-timeout", type=float, default=3,
+                        help="Seconds to wait for a node to accept a connection (default: 3)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print per-module import times before running the command")
+    parser.add_argument("--output", choices=("text", "json"), default="text",
+                        help="text, or one JSON document on stdout with progress text on stderr (default: text)")
+    parser.add_argument("--timings", action="store_true",
+                        help="Report wall time, API requests, bytes and per-endpoint latency on exit")
+
+
+def selected_command(argv):
+    """Find the subcommand in argv without building every subparser."""
+    # Like the main parser, no abbreviations: a subcommand's --out must not
+    # be read as the global --output.
+    pre = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    add_global_arguments(pre)
+    pre.add_argument("command", nargs="?")
+    known, _ = pre.parse_known_args(argv)
+    return known.command if known.command in COMMANDS else None
+
+
+def load_command(name):
+    module_name = COMMANDS[name][0]
+    if PROFILER:
+        return PROFILER.measure(module_name, importlib.import_module, module_name)
+    return importlib.import_module(module_name)
+
+
+def write_json_output(command, exit_code, timings):
+    """Print the command's structured results (and timings) as one JSON document on stdout."""
+    document = {"command": command, "exit_code": exit_code, "results": api.RESULTS.data}
+    if timings is not None:
+        document["timings"] = timings
+    json.dump(document, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
 
-# --- Main ---
 
 def main():
-    parser = argparse.ArgumentParser(description="Technitium DNS Manager")
-    parser.add_argument("--token", default=ENV_TOKEN, help="API Token (default: env TECHNITIUM_TOKEN)")
-    parser.add_argument("--primary", default=DEFAULT_PRIMARY, help=f"Primary IP (default: {DEFAULT_PRIMARY})")
-    parser.add_argument("--secondary", default=DEFAULT_SECONDARY, help=f"Secondary IP (default: {DEFAULT_SECONDARY})")
-    
+    parser = argparse.ArgumentParser(description="Technitium DNS Manager", allow_abbrev=False)
+    add_global_arguments(parser)
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    # Status
-    subparsers.add_parser("status", help="Check cluster status")
-
-    # Setup
-    setup_parser = subparsers.add_parser("setup", help="Run initial setup")
-    setup_parser.add_argument("--zone", default=DEFAULT_ZONE, help="Primary Zone Name")
-
-    # Create Zone
-    cz_parser = subparsers.add_parser("create-zone", help="Create a new primary zone")
-    cz_parser.add_argument("--zone", required=True, help="Zone name (e.g., localhost)")
-
-    # Reverse DNS
-    rev_parser = subparsers.add_parser("reverse-dns", help="Configure Reverse DNS zones")
-    rev_parser.add_argument("--target", default="192.168.1.1", help="Target DNS for forwarding (UDM Pro)")
-
-    # External DNS
-    edns_parser = subparsers.add_parser("external-dns", help="Configure External-DNS (TSIG + Zone)")
-    edns_parser.add_argument("--zone", default=DEFAULT_ZONE, help="Zone to configure")
-    edns_parser.add_argument("--secret", help="TSIG Shared Secret (required if key missing)")
-
-    # Forwarders
-    fwd_parser = subparsers.add_parser("forwarders", help="Update upstream forwarders")
-    fwd_parser.add_argument("forwarders", help="Comma-separated IPs (e.g., 9.9.9.9,1.1.1.1)")
-
-    # Import
-    imp_parser = subparsers.add_parser("import", help="Import Pi-hole Teleporter")
-    imp_parser.add_argument("--zip", required=True, help="Path to zip file")
-    imp_parser.add_argument("--zone", default=DEFAULT_ZONE, help="Target zone")
-    imp_parser.add_argument("--dry-run", action="store_true", help="Don't apply changes")
-    imp_parser.add_argument("--skip-existing", action="store_true", help="Skip existing records")
-    imp_parser.add_argument("--force", action="store_true", help="Allow records outside zone")
-
-    # Analyze
-    analyze_parser = subparsers.add_parser("analyze", help="Analyze NXDOMAIN queries")
-    analyze_parser.add_argument("--hours", type=int, default=24, help="Analyze last N hours (default: 24)")
-    analyze_parser.add_argument("--limit", type=int, default=20, help="Show top N domains (default: 20)")
+    # Only the selected command's module is imported and given its arguments;
+    # the others are registered by name and help text alone.
+    command = selected_command(sys.argv[1:])
+    module = command_parser = None
+    for name, (_, help_text) in COMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        if name == command:
+            module = load_command(name)
+            getattr(module, f"add_{name.replace('-', '_')}_arguments")(sub)
+            command_parser = sub
 
     args = parser.parse_args()
 
-    if not args.token:
+    offline_blocklists = args.command == "blocklists" and (args.offline or args.url)
+    if not args.token and not offline_blocklists:
         print("Error: API Token is required. Set TECHNITIUM_TOKEN env var or use --token.", file=sys.stderr)
         sys.exit(1)
 
-    if args.command == "status":
-        cmd_status(args)
-    elif args.command == "setup":
-        cmd_setup(args)
-    elif args.command == "create-zone":
-        cmd_create_zone(args)
-    elif args.command == "reverse-dns":
-        cmd_reverse_dns(args)
-    elif args.command == "external-dns":
-        cmd_external_dns(args)
-    elif args.command == "forwarders":
-        cmd_forwarders(args)
-    elif args.command == "import":
-        cmd_import(args)
-    elif args.command == "analyze":
-        cmd_analyze(args)
+    # `watch` measures live API health, so it never answers from the cache,
+    # retries or skips a node.
+    watching = args.command == "watch"
+    api.RESPONSE_CACHE.ttl = 0 if watching else args.cache_ttl
+    api.RETRY_POLICY.retries = 0 if watching else max(0, args.retries)
+    api.RETRY_POLICY.backoff = args.retry_backoff
+    api.RETRY_POLICY.threshold = 0 if watching else max(0, args.breaker_threshold)
+    api.RETRY_POLICY.cooldown = args.breaker_cooldown
+    api.RETRY_POLICY.connect_timeout = args.connect_timeout
+
+    if PROFILER:
+        PROFILER.uninstall()
+        PROFILER.report()
+
+    # With --output json the command's printed text moves to stderr, leaving
+    # stdout for the JSON document alone.
+    json_output = args.output == "json"
+    started = time.perf_counter()
+    exit_code = 1
+    try:
+        with contextlib.redirect_stdout(sys.stderr) if json_output else contextlib.nullcontext():
+            getattr(module, f"cmd_{args.command.replace('-', '_')}")(args)
+        exit_code = 0
+    except api.UsageError as e:
+        exit_code = 2
+        command_parser.error(str(e))
+    except SystemExit as e:
+        exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        raise
+    finally:
+        # Reported even when a command exits early with sys.exit().
+        timings = api.CALL_TIMINGS.summary(time.perf_counter() - started) if args.timings else None
+        api.print_retry_summary()
+        if args.connection_stats:
+            api.print_connection_stats()
+        if args.cache_stats:
+            api.print_cache_stats()
+        if json_output:
+            write_json_output(args.command, exit_code, timings)
+        elif timings:
+            api.print_timings(timings)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,151 @@
+"""
+Local SQLite cache of Technitium query log entries.
+
+Entries are stored per host keyed by timestamp (UTC epoch seconds), and a
+per-host (low, high) coverage window records which time range the cache
+holds completely. Callers fetch only the gaps outside that window and then
+answer queries from the local store.
+"""
+
+import os
+import sqlite3
+from datetime import datetime, timezone
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "technitium", "querylogs.sqlite"
+)
+
+# API entry field -> column. Order matters for INSERT.
+COLUMNS = (
+    ("timestamp", "ts"),
+    ("clientIpAddress", "client"),
+    ("protocol", "protocol"),
+    ("responseType", "response_type"),
+    ("responseRtt", "rtt"),
+    ("rcode", "rcode"),
+    ("qname", "qname"),
+    ("qtype", "qtype"),
+    ("qclass", "qclass"),
+    ("answer", "answer"),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    host TEXT NOT NULL,
+    ts REAL NOT NULL,
+    client TEXT,
+    protocol TEXT,
+    response_type TEXT,
+    rtt REAL,
+    rcode TEXT,
+    qname TEXT,
+    qtype TEXT,
+    qclass TEXT,
+    answer TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_host_ts ON entries (host, ts);
+CREATE TABLE IF NOT EXISTS coverage (
+    host TEXT PRIMARY KEY,
+    low REAL NOT NULL,
+    high REAL NOT NULL
+);
+"""
+
+
+def parse_timestamp(value):
+    """Convert an API timestamp (ISO 8601, usually with a Z suffix) to epoch seconds."""
+    dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def format_timestamp(epoch):
+    return datetime.fromtimestamp(epoch, timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class QueryLogCache:
+    """Query log store with per-host coverage watermarks."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def coverage(self, host):
+        """Return (low, high) epoch seconds held completely for host, or None."""
+        row = self.db.execute("SELECT low, high FROM coverage WHERE host = ?", (host,)).fetchone()
+        return tuple(row) if row else None
+
+    def set_coverage(self, host, low, high):
+        self.db.execute(
+            "INSERT INTO coverage (host, low, high) VALUES (?, ?, ?) "
+            "ON CONFLICT(host) DO UPDATE SET low = excluded.low, high = excluded.high",
+            (host, low, high),
+        )
+
+    def clear(self, host):
+        self.db.execute("DELETE FROM entries WHERE host = ?", (host,))
+        self.db.execute("DELETE FROM coverage WHERE host = ?", (host,))
+
+    def store(self, host, start, end, entries, batch_size=5000):
+        """Replace everything cached for host in [start, end) with `entries`.
+
+        Entries outside the range are dropped, so overlapping API windows never
+        produce duplicates. Returns the number of rows written.
+        """
+        self.db.execute("DELETE FROM entries WHERE host = ? AND ts >= ? AND ts < ?", (host, start, end))
+        placeholders = ", ".join("?" * (len(COLUMNS) + 1))
+        sql = f"INSERT INTO entries (host, {', '.join(col for _, col in COLUMNS)}) VALUES ({placeholders})"
+
+        written = 0
+        batch = []
+        for entry in entries:
+            ts = parse_timestamp(entry.get("timestamp", ""))
+            if not start <= ts < end:
+                continue
+            batch.append((host, ts) + tuple(entry.get(field) for field, _ in COLUMNS[1:]))
+            if len(batch) >= batch_size:
+                self.db.executemany(sql, batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            self.db.executemany(sql, batch)
+            written += len(batch)
+        return written
+
+    def commit(self):
+        self.db.commit()
+
+    def rollback(self):
+        self.db.rollback()
+
+    def prune(self, host, before):
+        """Drop entries older than `before` and move the low watermark up."""
+        self.db.execute("DELETE FROM entries WHERE host = ? AND ts < ?", (host, before))
+        cov = self.coverage(host)
+        if cov and cov[0] < before:
+            if cov[1] <= before:
+                self.clear(host)
+            else:
+                self.set_coverage(host, before, cov[1])
+
+    def iter_entries(self, host, start, end, rcode=None):
+        """Yield cached entries in [start, end) as API-shaped dicts."""
+        sql = f"SELECT {', '.join(col for _, col in COLUMNS)} FROM entries WHERE host = ? AND ts >= ? AND ts < ?"
+        params = [host, start, end]
+        if rcode:
+            sql += " AND rcode = ?"
+            params.append(rcode)
+        for row in self.db.execute(sql + " ORDER BY ts DESC", params):
+            entry = {field: value for (field, _), value in zip(COLUMNS, row)}
+            entry["timestamp"] = format_timestamp(row[0])
+            yield entry
+
+    def count(self, host):
+        return self.db.execute("SELECT COUNT(*) FROM entries WHERE host = ?", (host,)).fetchone()[0]
@@ -0,0 +1,154 @@
+"""
+Streaming counters for query log analysis.
+
+`ExactCounter` keeps every distinct key. `ApproxCounter` bounds memory on
+long-tail streams (DGA / CDN random subdomains) by combining:
+
+- Space-Saving: tracks the top `capacity` heavy hitters in O(1) per item.
+- Count-Min sketch: fixed-size frequency table used to tighten Space-Saving
+  counts (both over-estimate, so the minimum is the better estimate).
+- HyperLogLog: distinct-count estimate in 2^precision bytes.
+
+Keys are hashed with the built-in `hash()`, so estimates are stable within a
+process but not across runs (PYTHONHASHSEED).
+"""
+
+import math
+from array import array
+from collections import Counter
+
+_MASK64 = (1 << 64) - 1
+
+
+def _hash64(item):
+    return hash(item) & _MASK64
+
+
+class ExactCounter(Counter):
+    """Counter with the same interface as ApproxCounter."""
+
+    def add(self, item):
+        self[item] += 1
+
+    def distinct(self):
+        return len(self)
+
+
+class CountMinSketch:
+    """Count-Min sketch with `depth` rows of `width` counters."""
+
+    def __init__(self, width=2 ** 16, depth=4):
+        self.width = width
+        self.depth = depth
+        self.rows = [array("I", bytes(width * array("I").itemsize)) for _ in range(depth)]
+
+    def _indexes(self, item):
+        h = _hash64(item)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        # Kirsch-Mitzenmacher: derive every row index from two base hashes.
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, item, count=1):
+        for row, idx in zip(self.rows, self._indexes(item)):
+            row[idx] += count
+
+    def estimate(self, item):
+        return min(row[idx] for row, idx in zip(self.rows, self._indexes(item)))
+
+
+class SpaceSaving:
+    """Space-Saving heavy hitters using count buckets for O(1) updates."""
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counts = {}
+        self.buckets = {}
+        self.min_count = 0
+
+    def _move(self, item, old, new):
+        if old:
+            bucket = self.buckets[old]
+            bucket.discard(item)
+            if not bucket:
+                del self.buckets[old]
+                if old == self.min_count:
+                    self.min_count = new
+        self.buckets.setdefault(new, set()).add(item)
+        self.counts[item] = new
+
+    def add(self, item):
+        count = self.counts.get(item)
+        if count is not None:
+            self._move(item, count, count + 1)
+        elif len(self.counts) < self.capacity:
+            self._move(item, 0, 1)
+            self.min_count = 1
+        else:
+            # Evict one of the least-counted items; the newcomer inherits its count.
+            floor = self.min_count
+            evicted = self.buckets[floor].pop()
+            del self.counts[evicted]
+            if not self.buckets[floor]:
+                del self.buckets[floor]
+                self.min_count = floor + 1
+            self.buckets.setdefault(floor + 1, set()).add(item)
+            self.counts[item] = floor + 1
+
+    def most_common(self, n=None):
+        ranked = sorted(self.counts.items(), key=lambda kv: kv[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter with 2^precision one-byte registers."""
+
+    def __init__(self, precision=14):
+        self.p = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self.alpha = 0.7213 / (1 + 1.079 / self.m)
+
+    def add(self, item):
+        h = _hash64(item)
+        idx = h >> (64 - self.p)
+        rest = (h << self.p) & _MASK64
+        rank = (64 - self.p + 1) if rest == 0 else (65 - rest.bit_length())
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def count(self):
+        estimate = self.alpha * self.m * self.m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Small-range correction: linear counting.
+            return int(round(self.m * math.log(self.m / zeros)))
+        return int(round(estimate))
+
+
+class ApproxCounter:
+    """Bounded-memory top-K and distinct counter for a single key stream."""
+
+    def __init__(self, capacity=1000, width=2 ** 16, depth=4, precision=14):
+        self.heavy = SpaceSaving(capacity)
+        self.cms = CountMinSketch(width, depth)
+        self.hll = HyperLogLog(precision)
+
+    def add(self, item):
+        self.heavy.add(item)
+        self.cms.add(item)
+        self.hll.add(item)
+
+    def most_common(self, n=None):
+        ranked = [(item, min(count, self.cms.estimate(item))) for item, count in self.heavy.most_common()]
+        ranked.sort(key=lambda kv: kv[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+    def distinct(self):
+        return self.hll.count()
+
+
+def make_counter(mode, capacity=1000):
+    """Return an exact or approximate counter for `analyze --mode`."""
+    if mode == "approx":
+        return ApproxCounter(capacity=capacity)
+    return ExactCounter()
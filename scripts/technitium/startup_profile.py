@@ -0,0 +1,61 @@
+"""
+Per-module import timing for `manage.py --profile-startup`.
+
+Deliberately imports nothing beyond builtins, sys and time so it can be
+installed before manage.py loads anything else.
+"""
+
+import builtins
+import sys
+import time
+
+
+class ImportProfiler:
+    """Record the time of every first-time import while installed.
+
+    Times are inclusive: a module's time covers the imports it triggers,
+    which are listed indented beneath it.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.records = []
+        self._depth = 0
+        self._original = builtins.__import__
+
+    def install(self):
+        builtins.__import__ = self._import
+        return self
+
+    def uninstall(self):
+        builtins.__import__ = self._original
+
+    def measure(self, name, load, *args):
+        """Call load(*args), recording its duration under name."""
+        index = len(self.records)
+        self.records.append(None)
+        self._depth += 1
+        started = time.perf_counter()
+        try:
+            return load(*args)
+        finally:
+            self._depth -= 1
+            self.records[index] = (self._depth, name, time.perf_counter() - started)
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        return self.measure(name, self._original, name, globals, locals, fromlist, level)
+
+    def report(self, min_ms=0.5, out=sys.stderr):
+        total = time.perf_counter() - self.started
+        print("\n--- Startup Profile ---", file=out)
+        for depth, name, seconds in self.records:
+            if seconds * 1000 >= min_ms:
+                print(f"{seconds * 1000:8.2f} ms  {'  ' * depth}{name}", file=out)
+        print(f"{total * 1000:8.2f} ms  from profiler start to command dispatch "
+              f"(imports under {min_ms} ms not shown)", file=out)
+
+
+def start():
+    return ImportProfiler().install()